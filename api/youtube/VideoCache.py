@@ -0,0 +1,166 @@
+import datetime
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import IndexModel, ASCENDING, UpdateOne
+
+from database import MotorSingleton
+from tools import CacheStats, LRUCache
+
+# Seconds the details of a finished video stay cached
+VIDEO_CACHE_TTL = 6 * 60 * 60
+# Seconds the details of an upcoming or live stream stay cached, they change when the stream is rescheduled
+VIDEO_CACHE_UPCOMING_TTL = 10 * 60
+# Maximum number of videos kept in memory
+VIDEO_CACHE_SIZE = 2048
+# The fields YouTube reads, everything else in a videos.list item is dropped before caching
+VIDEO_FIELDS = {
+    "snippet": ["title", "channelTitle", "publishedAt", "liveBroadcastContent"],
+    "liveStreamingDetails": ["scheduledStartTime"],
+    "status": ["uploadStatus"],
+    "contentDetails": ["duration"],
+}
+
+
+def trim_video(video: dict) -> dict:
+    """
+    Keeps only the fields of a videos.list item that YouTube reads.
+
+    :param video: The videos.list item.
+    :return: dict
+    """
+    trimmed = {"id": video["id"]}
+    for part, fields in VIDEO_FIELDS.items():
+        if part in video:
+            trimmed[part] = {field: video[part][field] for field in fields if field in video[part]}
+    return trimmed
+
+
+class VideoCache:
+    """
+    Caches video details from videos.list by video ID, so a video pasted in several guilds, or pasted again while an
+    event is being fixed, costs one API call. Upcoming and live streams expire after `upcoming_ttl` seconds, other
+    videos after `ttl`. At most `max_size` videos are kept in memory, least recently used ones are evicted first.
+
+    When a Motor collection is given, cached videos are also written to it, with a TTL index removing them once
+    they expire, and videos missing from memory are looked up there before the API is called. This lets the cache
+    survive restarts.
+    """
+
+    def __init__(
+            self, ttl: float = VIDEO_CACHE_TTL, upcoming_ttl: float = VIDEO_CACHE_UPCOMING_TTL,
+            max_size: int = VIDEO_CACHE_SIZE, collection=None
+    ):
+        self.ttl = ttl
+        self.upcoming_ttl = upcoming_ttl
+        self.memory: LRUCache[str, Tuple[float, dict]] = LRUCache(max_size)
+        self.collection = collection
+        self.store_hits = 0
+        self.logger = logging.getLogger("Onigiri")
+        self._indexed = False
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.memory.stats
+
+    def __str__(self) -> str:
+        return f"{self.stats}, {self.store_hits} loaded from MongoDB"
+
+    def expiry(self, video: dict) -> float:
+        upcoming = video.get("snippet", {}).get("liveBroadcastContent") in ("upcoming", "live")
+        return time.time() + (self.upcoming_ttl if upcoming else self.ttl)
+
+    async def get_many(self, video_ids: List[str]) -> Dict[str, dict]:
+        """
+        Gets the cached details of videos. Videos that are not cached, or whose entry expired, are left out.
+
+        :param video_ids: The IDs of the videos.
+        :return: The details of each cached video by its ID.
+        """
+        found = {}
+        now = time.time()
+        for video_id in video_ids:
+            entry = self.memory.peek(video_id)
+            if entry and entry[0] > now:
+                found[video_id] = self.memory.get(video_id)[1]
+            else:
+                if entry:
+                    self.memory.pop(video_id)
+                self.memory.stats.misses += 1
+        missing = [video_id for video_id in video_ids if video_id not in found]
+        if missing and self.collection is not None:
+            try:
+                async for doc in self.collection.find(
+                        {"_id": {"$in": missing}, "expires_at": {"$gt": datetime.datetime.utcnow()}}
+                ):
+                    expires_at = doc["expires_at"].replace(tzinfo=datetime.timezone.utc).timestamp()
+                    self.memory.put(doc["_id"], (expires_at, doc["video"]))
+                    found[doc["_id"]] = doc["video"]
+                    self.store_hits += 1
+            except Exception as e:
+                self.logger.warning(f"Could not read the YouTube video cache from MongoDB: {e}")
+        return found
+
+    async def get(self, video_id: str) -> Optional[dict]:
+        return (await self.get_many([video_id])).get(video_id)
+
+    async def put_many(self, videos: Dict[str, dict]) -> None:
+        """
+        Caches the details of videos.
+
+        :param videos: The videos.list items to cache, by the video ID they were requested with.
+        """
+        updates = []
+        for video_id, video in videos.items():
+            video = trim_video(video)
+            expires_at = self.expiry(video)
+            self.memory.put(video_id, (expires_at, video))
+            updates.append(UpdateOne({"_id": video_id}, {"$set": {
+                "video": video, "expires_at": datetime.datetime.utcfromtimestamp(expires_at)
+            }}, upsert=True))
+        if updates and self.collection is not None:
+            try:
+                if not self._indexed:
+                    await self.collection.create_indexes([
+                        IndexModel([("expires_at", ASCENDING)], name="expires_at", expireAfterSeconds=0)
+                    ])
+                    self._indexed = True
+                await self.collection.bulk_write(updates, ordered=False)
+            except Exception as e:
+                self.logger.warning(f"Could not write the YouTube video cache to MongoDB: {e}")
+
+    async def put(self, video_id: str, video: dict) -> None:
+        await self.put_many({video_id: video})
+
+
+_instance: Optional[VideoCache] = None
+
+
+def get_video_cache() -> VideoCache:
+    """
+    Returns the video cache shared by the whole bot. Persistence follows the schedule database backend: with
+    `SCHEDULE_DB_BACKEND=motor` the cache is backed by the YouTubeVideos collection through the Motor client the
+    schedule database already uses, otherwise it stays in memory. `YT_CACHE_PERSIST=0` keeps it in memory either way.
+
+    :return: VideoCache
+    """
+    global _instance
+    if _instance is None:
+        load_dotenv()
+        collection = None
+        if os.getenv("SCHEDULE_DB_BACKEND", "pymongo").lower() == "motor" and os.getenv("YT_CACHE_PERSIST", "1") != "0":
+            collection = MotorSingleton.conn().client["Onigiri-Fillings"]["YouTubeVideos"]
+        _instance = VideoCache(collection=collection)
+    return _instance
+
+
+def peek_video_cache() -> Optional[VideoCache]:
+    """
+    Returns the shared video cache without creating it.
+
+    :return: The cache, None if no video was ever looked up.
+    """
+    return _instance
@@ -1,35 +1,86 @@
+import asyncio
 import datetime
-import os
-from typing import Literal
+from typing import Literal, Optional, TypeVar, Type
 
-import googleapiclient.discovery
 import isodate
 import pytz
-from dotenv import load_dotenv
 
-from api.youtube import YouTubeURL
+from api.youtube.YouTubeClient import YouTubeClient, get_youtube_client, close_youtube_client
+from api.youtube.YouTubeURL import YouTubeURL
+from api.youtube.VideoCache import VideoCache, get_video_cache
 from tools.constants import JST
 
-load_dotenv()
+Y = TypeVar("Y")
+
+
+def iso_to_datetime_jst(iso_time: str) -> datetime.datetime:
+    return datetime.datetime.strptime(iso_time, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.UTC).astimezone(JST)
 
 
 class YouTube:
-    def __init__(self, url: YouTubeURL):
-        self.__api = googleapiclient.discovery.build("youtube", "v3", developerKey=os.getenv("YT_API"))
-        self.__parts = "snippet, liveStreamingDetails, status, contentDetails"
+    parts = ["snippet", "liveStreamingDetails", "status", "contentDetails"]
+
+    def __init__(self, url: YouTubeURL, video: dict):
         self.url: YouTubeURL = url
-        self.video = self.__api.videos().list(part=self.__parts, id=self.url.get_id()).execute().get("items", [])[0]
+        self.video = video
+
+    @classmethod
+    async def fetch(
+            cls: Type[Y], url: YouTubeURL, client: Optional[YouTubeClient] = None, cache: Optional[VideoCache] = None
+    ) -> Y:
+        """
+        Gets the details of a video.
+
+        :param url: The URL of the video.
+        :param client: The client to call the API with, defaults to the shared one.
+        :param cache: The cache to look the video up in first, defaults to the shared one.
+        :return: YouTube
+        :raises ValueError: If the video cannot be found.
+        """
+        return cls(url, await cls.get_video(url.get_id(), client, cache))
+
+    @classmethod
+    async def resolve(
+            cls: Type[Y], url: str, client: Optional[YouTubeClient] = None, cache: Optional[VideoCache] = None
+    ) -> Y:
+        """
+        Validates a YouTube URL and gets the details of its video in a single videos.list call, or none if the video
+        is cached. The returned object carries the URL of the video under its canonical ID, like
+        YouTubeURL.unsafe() would return.
+
+        :param url: The URL to resolve.
+        :param client: The client to call the API with, defaults to the shared one.
+        :param cache: The cache to look the video up in first, defaults to the shared one.
+        :return: YouTube
+        :raises ValueError: If the URL is not a YouTube URL, or its video cannot be found.
+        """
+        video = await cls.get_video(YouTubeURL.safe(url).get_id(), client, cache)
+        return cls(YouTubeURL.safe(f"https://youtu.be/{video['id']}"), video)
+
+    @classmethod
+    async def get_video(
+            cls, video_id: str, client: Optional[YouTubeClient] = None, cache: Optional[VideoCache] = None
+    ) -> dict:
+        cache = cache or get_video_cache()
+        if (video := await cache.get(video_id)) is None:
+            if not (videos := await (client or get_youtube_client()).videos_list([video_id], cls.parts)):
+                raise ValueError("Specified video cannot be found.")
+            video = videos[0]
+            await cache.put(video_id, video)
+        return video
 
     @property
     def start_time(self) -> datetime.datetime:
-        def iso_to_datetime_jst(iso_time):
-            return datetime.datetime.strptime(iso_time, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.UTC).astimezone(JST)
+        return self.scheduled_start_time or iso_to_datetime_jst(self.video["snippet"]["publishedAt"])
 
-        if ls_detail := self.video.get("liveStreamingDetails"):
-            iso = ls_detail["scheduledStartTime"]
-        else:
-            iso = self.video["snippet"]["publishedAt"]
-        return iso_to_datetime_jst(iso)
+    @property
+    def scheduled_start_time(self) -> Optional[datetime.datetime]:
+        """
+        The time the stream or premiere is scheduled to start at, None for plain videos.
+        """
+        if iso := self.video.get("liveStreamingDetails", {}).get("scheduledStartTime"):
+            return iso_to_datetime_jst(iso)
+        return None
 
     @property
     def title(self) -> str:
@@ -58,7 +109,11 @@ class YouTube:
 
 
 if __name__ == "__main__":
-    vid2 = YouTube(YouTubeURL.unsafe("https://www.youtube.com/watch?v=5a8NyGLlorI"))
-    vid3 = YouTube(YouTubeURL.unsafe("https://www.youtube.com/watch?v=Akn_Gdi05Ys"))
-    print(vid2.title, vid2.channel, vid2.start_time, vid2.content_type, vid2.url.get_short_url())
-    print(vid3.title, vid3.channel, vid3.start_time, vid3.content_type, vid3.url.get_short_url())
+    async def main():
+        vid2 = await YouTube.resolve("https://www.youtube.com/watch?v=5a8NyGLlorI")
+        vid3 = await YouTube.resolve("https://www.youtube.com/watch?v=Akn_Gdi05Ys")
+        print(vid2.title, vid2.channel, vid2.start_time, vid2.content_type, vid2.url.get_short_url())
+        print(vid3.title, vid3.channel, vid3.start_time, vid3.content_type, vid3.url.get_short_url())
+        await close_youtube_client()
+
+    asyncio.run(main())
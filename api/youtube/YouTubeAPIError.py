@@ -0,0 +1,5 @@
+class YouTubeAPIError(Exception):
+    def __init__(self, message: str = "", status: int = 0):
+        super().__init__(message)
+        self.message = message
+        self.status = status
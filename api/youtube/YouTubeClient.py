@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import random
+from typing import List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+from api.youtube.YouTubeAPIError import YouTubeAPIError
+
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+# Statuses worth another attempt, anything else is reported straight away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class YouTubeClient:
+    """
+    An asyncio client for the parts of the YouTube Data API the bot uses. All requests share one pooled HTTP session,
+    which is opened on the first request, so a client can be created before the event loop runs.
+
+    Requests time out after `timeout` seconds and are retried up to `retries` times on connection errors, timeouts
+    and rate limit or server errors, waiting `backoff` seconds before the first retry and twice as long before each
+    next one. `base_url` points the client at another server, such as a local stub in tests.
+
+    `requests` counts every request sent, retries and failed ones included, as each of them costs quota.
+    """
+
+    def __init__(
+            self, api_key: Optional[str] = None, base_url: Optional[str] = None, timeout: float = 10,
+            retries: int = 3, backoff: float = 0.5, max_connections: int = 10
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("YT_API", "")
+        self.base_url = (base_url or os.getenv("YT_API_URL") or YOUTUBE_API_URL).rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self.requests = 0
+        self.logger = logging.getLogger("Onigiri")
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout, connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the HTTP session. The next request opens a new one.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def videos_list(self, video_ids: List[str], parts: List[str]) -> List[dict]:
+        """
+        Calls videos.list. Videos that don't exist are left out of the result, in no particular order.
+
+        :param video_ids: The IDs of the videos, at most 50.
+        :param parts: The resource parts to get, such as "snippet".
+        :return: List[dict]
+        """
+        if not video_ids:
+            return []
+        response = await self.get("videos", {"part": ",".join(parts), "id": ",".join(video_ids)})
+        return response.get("items", [])
+
+    async def get(self, resource: str, params: dict) -> dict:
+        """
+        Sends a GET request to the API, retrying transient failures.
+
+        :param resource: The resource path, such as "videos".
+        :param params: The query parameters, without the API key.
+        :return: The decoded JSON response.
+        :raises YouTubeAPIError: If the request fails for good.
+        """
+        url = f"{self.base_url}/{resource}"
+        params = {**params, "key": self.api_key}
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            self.requests += 1
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    reason = await response.text()
+                    if response.status not in RETRY_STATUSES or last:
+                        raise YouTubeAPIError(f"YouTube API returned {response.status}: {reason[:200]}",
+                                              response.status)
+                    error = f"status {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last:
+                    raise YouTubeAPIError(f"YouTube API request failed: {e!r}") from e
+                error = repr(e)
+            delay = self.backoff * 2 ** attempt * random.uniform(0.8, 1.2)
+            self.logger.warning(f"YouTube API {resource} failed ({error}), retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+        raise YouTubeAPIError("YouTube API request failed.")
+
+
+_instance: Optional[YouTubeClient] = None
+
+
+def get_youtube_client() -> YouTubeClient:
+    """
+    Returns the YouTube client shared by the whole bot, so every lookup reuses the same connections. It is created on
+    first use rather than at import, which keeps importing api.youtube free of any I/O.
+
+    :return: YouTubeClient
+    """
+    global _instance
+    if _instance is None:
+        load_dotenv()
+        _instance = YouTubeClient()
+    return _instance
+
+
+async def close_youtube_client() -> None:
+    """
+    Closes the shared YouTube client's HTTP session, if the client was ever created.
+    """
+    if _instance is not None:
+        await _instance.close()
@@ -1,16 +1,12 @@
-import os
 import re
-from typing import TypeVar, Type
+from typing import TypeVar, Type, Optional
 
-import googleapiclient.discovery
-from dotenv import load_dotenv
+from api.youtube.YouTubeClient import YouTubeClient, get_youtube_client
 
-load_dotenv()
 Y = TypeVar("Y")
 
 
 class YouTubeURL:
-    __api = googleapiclient.discovery.build("youtube", "v3", developerKey=os.getenv("YT_API"))
     __build_key = "abcd1234"
     url_regex = r"^((?:https?:)?\/\/)?((?:www|m)\.)?((?:youtube(-nocookie)?\.com|youtu.be))(\/(?:[\w\-]+" \
                 r"\?v=|embed\/|live\/|v\/)?)([\w\-]+)(\S+)?$"
@@ -33,11 +29,11 @@ class YouTubeURL:
         return self._id
 
     @classmethod
-    def unsafe(cls: Type[Y], url: str) -> Y:
+    async def unsafe(cls: Type[Y], url: str, client: Optional[YouTubeClient] = None) -> Y:
         if not (match := re.search(YouTubeURL.url_regex, url, re.IGNORECASE)):
             raise ValueError("Specified URL is not a valid YouTube URL.")
         _id = match.group(6)
-        if not (videos := YouTubeURL.__api.videos().list(part="snippet", id=_id).execute().get("items", [])):
+        if not (videos := await (client or get_youtube_client()).videos_list([_id], ["snippet"])):
             raise ValueError("Specified video cannot be found.")
         _id = videos[0]["id"]
         return cls(_id, build_key=cls.__build_key)
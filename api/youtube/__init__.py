@@ -1,2 +1,5 @@
-from api.youtube.YouTube import YouTube
+from api.youtube.YouTubeAPIError import YouTubeAPIError
+from api.youtube.YouTubeClient import YouTubeClient, get_youtube_client, close_youtube_client
 from api.youtube.YouTubeURL import YouTubeURL
+from api.youtube.VideoCache import VideoCache, get_video_cache, peek_video_cache
+from api.youtube.YouTube import YouTube
@@ -0,0 +1,32 @@
+import os
+from typing import TypeVar, Type
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+load_dotenv()
+
+T = TypeVar("T")
+
+
+class MotorSingleton:
+    _instance = None
+    # Same guard as MongoSingleton, the client must be shared across the whole bot
+    _singleton_key = "Q2vNc8uBzq0sWd4kTnXe7LmYh3Jf6RpA"
+
+    @classmethod
+    def conn(cls: Type[T]) -> T:
+        if cls._instance and isinstance(cls._instance, MotorSingleton):
+            return cls._instance
+        else:
+            cls._instance = cls(singleton_key=cls._singleton_key)
+            return cls._instance
+
+    def __init__(self, **kwargs):
+        if kwargs.get("singleton_key", "") == "Q2vNc8uBzq0sWd4kTnXe7LmYh3Jf6RpA":
+            self.client = AsyncIOMotorClient(
+                f"mongodb+srv://{os.getenv('MONGO_USER')}:{os.getenv('MONGO_PASS')}"
+                f"@onigiri.cal6d.mongodb.net/?retryWrites=true&w=majority"
+            )
+        else:
+            raise ValueError("You must access the DB Connection via `MotorSingleton.conn()`.")
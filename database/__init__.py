@@ -1 +1,2 @@
 from database.MongoSingleton import MongoSingleton
+from database.MotorSingleton import MotorSingleton
@@ -1,20 +1,33 @@
+import asyncio
+import hashlib
 import logging
-from typing import List
+import time
+from datetime import timedelta
+from typing import List, Optional, Literal, Tuple
 
 import discord
 from discord import app_commands, NotFound, Forbidden
+from discord.app_commands import AppCommandError
 from discord.ext import tasks
 from discord.ext.commands import GroupCog
-from discord.ui import button, View
+from discord.ui import button, Button, View, Modal, TextInput
 
+from api.youtube import YouTube, YouTubeAPIError, close_youtube_client, get_video_cache, peek_video_cache, \
+    get_youtube_client
 from exceptions import InvalidArgument
-from features.schedule.constants import YES, THINKING, CANCELLED, NO, WARNING
-from features.schedule.database import ScheduleDB
+from features.schedule.constants import YES, THINKING, CANCELLED, NO, WARNING, REFRESHED_RESOLUTION, \
+    REFRESH_CONCURRENCY, GUILD_REFRESH_TIMEOUT, SAFETY_NET_REFRESH_MINUTES, REFRESH_DEBOUNCE, PAST_EVENTS_DISPLAYED, \
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL_HOURS, IMPORT_MAX_BYTES, BULK_MAX_EVENTS, \
+    HISTORY_PAGE_SIZE, YOUTUBE_SYNC_INTERVAL_MINUTES, YOUTUBE_SYNC_BATCH_SIZE
+from features.schedule.database import get_schedule_db
 from features.schedule.display_data import Descriptions, Messages
 from features.schedule.exceptions import MessageUnsendable, MessageUnreachable
 from features.schedule.models import Event, GuildScheduleConfig, DatetimeGranularity
+from features.schedule.refresh import RefreshScheduler, RefreshCoordinator, TaskSupervisor
 from features.schedule.util import type_autocomplete, guild_registered, author_is_editor, validate_arguments, \
-    author_is_admin, parse_date, parse_time, parse_type, render_schedule, guild_enabled
+    author_is_admin, parse_date, parse_time, parse_type, render_schedule, guild_enabled, next_render_change, \
+    schedule_context, parse_import, render_history, history_cursor_id, parse_history_cursor_id, \
+    group_by_video, synced_events
 from onigiri import Onigiri
 
 desc = Descriptions()
@@ -50,6 +63,21 @@ def split_messages(schedule_content: List[str], num_messages: int) -> List[List[
     return sub_lists
 
 
+def hash_content(content: str) -> str:
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def parse_event_ids(event_ids: str) -> List[str]:
+    event_ids = list(dict.fromkeys(event_ids.replace(",", " ").split()))
+    if not event_ids:
+        raise InvalidArgument("No event IDs given.")
+    if invalid := [event_id for event_id in event_ids if not (len(event_id) == 4 and event_id.isdigit())]:
+        raise InvalidArgument(f"Invalid event ID(s): {', '.join(invalid)}. Event IDs are 4 digits.")
+    if len(event_ids) > BULK_MAX_EVENTS:
+        raise InvalidArgument(f"Too many events. Max {BULK_MAX_EVENTS} (Currently {len(event_ids)}).")
+    return event_ids
+
+
 @app_commands.guild_only()
 @app_commands.default_permissions(send_messages=True)
 class Schedule(GroupCog, name="schedule", description="Commands under the schedule module."):
@@ -57,11 +85,29 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
         super().__init__()
         self.logger = logging.getLogger("Onigiri.schedule")
         self.client = client
-        self.db = ScheduleDB()
+        self.db = get_schedule_db()
+        self.coordinator = RefreshCoordinator(self.update_schedule_messages, REFRESH_DEBOUNCE)
+        self.scheduler = RefreshScheduler(self.refresh_guild, REFRESH_CONCURRENCY)
+        self.background = TaskSupervisor(self.logger)
         self.update_schedule.start()
+        self.archive_events.start()
+        self.sync_youtube_events.start()
 
-    def cog_unload(self) -> None:
+    async def cog_load(self) -> None:
+        if failed := await self.db.ensure_indexes():
+            self.logger.warning(f"Could not create schedule indexes: {', '.join(failed)}")
+        if backfilled := await self.db.backfill_youtube_starts():
+            self.logger.info(f"<Backfilled the video start of {backfilled} YouTube events.>")
+        self.scheduler.start()
+
+    async def cog_unload(self) -> None:
         self.update_schedule.cancel()
+        self.archive_events.cancel()
+        self.sync_youtube_events.cancel()
+        self.scheduler.stop()
+        await self.background.drain(GUILD_REFRESH_TIMEOUT)
+        self.coordinator.cancel()
+        await close_youtube_client()
 
     async def create_schedule_messages(self, channel: discord.TextChannel, num_msg: int = 2) -> List[discord.Message]:
         channel = self.client.get_channel(channel.id)
@@ -70,61 +116,215 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             messages.append(await channel.send(content="** **"))
         return messages
 
-    async def update_schedule_messages(self, guild_id: int) -> None:
+    async def request_refresh(self, guild_id: int, force: bool = False, delay: Optional[float] = None) -> int:
+        """
+        Refreshes the schedule of a guild through the refresh coordinator. Requests arriving close together share one
+        refresh, and never run alongside another refresh of the same guild.
+
+        :param guild_id: The ID of the guild.
+        :param force: Edit every message, even if its content did not change.
+        :param delay: Overrides the coalescing window, 0 to refresh as soon as no other refresh is in flight.
+        :return: The number of Discord REST calls made by the refresh.
+        """
+        return await asyncio.shield(self.coordinator.request(guild_id, force, delay))
+
+    def refresh_in_background(self, interaction: discord.Interaction, force: bool = False) -> None:
+        """
+        Requests a refresh of the interaction's guild without waiting for it, so the command can finish right away.
+        If the refresh fails, the error is sent to the user as a followup.
+
+        :param interaction: The interaction of the command that changed the schedule.
+        :param force: Edit every message, even if its content did not change.
+        :return: None
+        """
+        async def refresh():
+            try:
+                await self.request_refresh(interaction.guild.id, force)
+            except AppCommandError as e:
+                error_message = getattr(e, "message", str(e))
+                await interaction.followup.send(
+                    f"{WARNING}**The schedule could not be refreshed**:\n```{error_message}```", ephemeral=True
+                )
+            except Exception as e:
+                self.logger.exception(e)
+                await interaction.followup.send(
+                    f"{WARNING}**The schedule could not be refreshed.** Try **/schedule refresh** later.",
+                    ephemeral=True
+                )
+
+        self.background.spawn(refresh(), name=f"refresh-{interaction.guild.id}")
+
+    async def update_schedule_messages(self, guild_id: int, force: bool = False) -> int:
+        """
+        Renders the schedule of a guild and edits it into its schedule messages. Messages whose content is identical
+        to what was last pushed to them are skipped, unless `force` is set. Use request_refresh() instead of calling
+        this directly.
+
+        :param guild_id: The ID of the guild.
+        :param force: Edit every message, even if its content did not change.
+        :return: The number of Discord REST calls made.
+        """
         self.logger.info(f"Updating schedule for guild {guild_id}:")
         log_prefix = f"    ↳ {guild_id}: "
         discord_guild = self.client.get_guild(guild_id)
         if not discord_guild:
             self.logger.info(f"{log_prefix}This bot instance is not in the guild.")
-            return
+            return 0
         guild = await self.db.get_guild(guild_id)
         if not guild:
             self.logger.warning(f"{log_prefix}Guild is not registered!")
-            return
+            return 0
         self.logger.info(f"{log_prefix}{discord_guild.name}")
-        events = await self.db.get_guild_events(guild.guild_id)
-        self.logger.info(f"{log_prefix}{len(events)} events.")
+        window = await self.db.get_schedule_window(guild.guild_id, PAST_EVENTS_DISPLAYED)
+        self.logger.info(
+            f"{log_prefix}{len(window.events)} of {window.past_total + len(window.upcoming)} events shown."
+        )
         channel = self.client.get_channel(guild.schedule_channel_id)
         if not channel:
             raise MessageUnreachable
         num_messages = len(guild.schedule_message_id_array)
-        schedule = render_schedule(guild, events)
+        schedule = render_schedule(guild, window, REFRESHED_RESOLUTION)
+        self.scheduler.schedule(guild.guild_id, next_render_change(window.events) if guild.enabled else None)
         schedule_messages = split_messages(schedule, num_messages)
         total_length = 0
-        for i, message_id in enumerate(guild.schedule_message_id_array):
-            try:
-                message = await channel.fetch_message(message_id)
-            except NotFound:
-                raise MessageUnreachable
-            except Forbidden:
-                raise MessageUnreachable
-            if not schedule_messages[i][-1]:
-                schedule_messages[i][-1] = "** **"
-            if not schedule_messages[i][0]:
-                schedule_messages[i][0] = "** **"
-            if schedule_messages[i][0].startswith(" "):
-                schedule_messages[i][0] = "** **" + schedule_messages[i][0][1:]
-            content = "\n".join(schedule_messages[i])
-            total_length += len(content)
-            self.logger.info(f"{log_prefix}Message {i}, {len(content)} characters.")
-            await message.edit(content=content)
-        self.logger.info(f"{log_prefix}Total {total_length} characters.")
-
-    @tasks.loop(minutes=2)
+        rest_calls = 0
+        hashes = {}
+        try:
+            for i, message_id in enumerate(guild.schedule_message_id_array):
+                if not schedule_messages[i][-1]:
+                    schedule_messages[i][-1] = "** **"
+                if not schedule_messages[i][0]:
+                    schedule_messages[i][0] = "** **"
+                if schedule_messages[i][0].startswith(" "):
+                    schedule_messages[i][0] = "** **" + schedule_messages[i][0][1:]
+                content = "\n".join(schedule_messages[i])
+                content_hash = hash_content(content)
+                total_length += len(content)
+                if not force and guild.schedule_message_hashes.get(str(message_id)) == content_hash:
+                    hashes[str(message_id)] = content_hash
+                    self.logger.info(f"{log_prefix}Message {i}, {len(content)} characters, unchanged.")
+                    continue
+                self.logger.info(f"{log_prefix}Message {i}, {len(content)} characters.")
+                # Edit through a partial message, the stored ID is all the edit route needs
+                rest_calls += 1
+                try:
+                    await channel.get_partial_message(message_id).edit(content=content)
+                except NotFound:
+                    raise MessageUnreachable
+                except Forbidden:
+                    raise MessageUnreachable
+                hashes[str(message_id)] = content_hash
+        finally:
+            if hashes != guild.schedule_message_hashes:
+                await self.db.set_guild_message_hashes(guild.guild_id, hashes)
+        self.logger.info(f"{log_prefix}Total {total_length} characters, {rest_calls} REST calls.")
+        return rest_calls
+
+    async def refresh_guild(self, guild_id: int) -> Optional[int]:
+        """
+        Refreshes a guild in the background. The refresh has its own timeout, and its errors are logged instead of
+        being raised.
+
+        :param guild_id: The ID of the guild.
+        :return: REST calls made, None if the refresh failed.
+        """
+        log_prefix = f"    ↳ {guild_id}: "
+        try:
+            return await asyncio.wait_for(self.request_refresh(guild_id, delay=0), GUILD_REFRESH_TIMEOUT)
+        except MessageUnreachable:
+            self.logger.warning(f"{log_prefix}Schedule message(s) unreachable.")
+        except asyncio.TimeoutError:
+            self.logger.warning(f"{log_prefix}Refresh timed out after {GUILD_REFRESH_TIMEOUT}s.")
+        except Exception as e:
+            self.logger.exception(e)
+        return None
+
+    @tasks.loop(minutes=SAFETY_NET_REFRESH_MINUTES)
     async def update_schedule(self):
         guilds = await self.db.get_enabled_guilds()
         self.logger.info(f"<Auto-refreshing all enabled guilds... ({len(guilds)})>")
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+        async def refresh(guild_id: int) -> Optional[int]:
+            async with semaphore:
+                return await self.refresh_guild(guild_id)
+
+        results = await asyncio.gather(*(refresh(guild.guild_id) for guild in guilds))
+        refreshed = [result for result in results if result is not None]
+        self.logger.info(
+            f"<Auto-refreshed {len(refreshed)}/{len(guilds)} guilds in {time.perf_counter() - start:.2f}s, "
+            f"{sum(refreshed)} REST calls.>"
+        )
+        self.logger.info(f"    ↳ Guild config cache: {self.db.guild_cache.stats}")
+        self.logger.info(f"    ↳ Schedule window cache: {self.db.window_cache.stats}")
+        self.logger.info(f"    ↳ Event cache: {self.db.event_cache.stats}")
+        if video_cache := peek_video_cache():
+            self.logger.info(f"    ↳ YouTube video cache: {video_cache}")
+
+    @update_schedule.before_loop
+    async def before_update_schedule(self):
+        await self.client.wait_until_ready()
+
+    @tasks.loop(hours=ARCHIVE_INTERVAL_HOURS)
+    async def archive_events(self):
+        guilds = await self.db.get_all_guilds()
+        older_than = discord.utils.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+        self.logger.info(f"<Archiving events older than {ARCHIVE_AFTER_DAYS} days... ({len(guilds)} guilds)>")
+        start = time.perf_counter()
+        archived = 0
         for guild in guilds:
-            log_prefix = f"    ↳ {guild.guild_id}: "
             try:
-                await self.update_schedule_messages(guild.guild_id)
-            except MessageUnreachable:
-                self.logger.warning(f"{log_prefix}Schedule message(s) unreachable.")
+                archived += await self.db.archive_events(
+                    guild.guild_id, older_than, PAST_EVENTS_DISPLAYED, ARCHIVE_BATCH_SIZE
+                )
             except Exception as e:
+                self.logger.warning(f"    ↳ {guild.guild_id}: Archiving failed.")
                 self.logger.exception(e)
+        self.logger.info(f"<Archived {archived} events in {time.perf_counter() - start:.2f}s.>")
 
-    @update_schedule.before_loop
-    async def before_update_schedule(self):
+    @archive_events.before_loop
+    async def before_archive_events(self):
+        await self.client.wait_until_ready()
+
+    @tasks.loop(minutes=YOUTUBE_SYNC_INTERVAL_MINUTES)
+    async def sync_youtube_events(self):
+        by_video = group_by_video(await self.db.get_youtube_events())
+        self.logger.info(f"<Syncing YouTube events... ({len(by_video)} videos)>")
+        start = time.perf_counter()
+        video_ids = list(by_video)
+        videos = {}
+        client = get_youtube_client()
+        sent = client.requests
+        for i in range(0, len(video_ids), YOUTUBE_SYNC_BATCH_SIZE):
+            try:
+                items = await client.videos_list(video_ids[i:i + YOUTUBE_SYNC_BATCH_SIZE], YouTube.parts)
+            except YouTubeAPIError as e:
+                self.logger.warning(f"    ↳ videos.list failed: {e.message}")
+                if e.status == 403:
+                    break  # Out of quota, the other batches would fail too
+                continue
+            videos.update({item["id"]: item for item in items})
+        # Fresh details are worth keeping for the next /schedule add of the same video
+        await get_video_cache().put_many(videos)
+        changed = synced_events(by_video, videos)
+        updated = await self.db.update_event_times(changed)
+        guild_ids = {event.guild_id for event in changed}
+        results = await asyncio.gather(*(self.request_refresh(guild_id) for guild_id in guild_ids),
+                                       return_exceptions=True)
+        for guild_id, result in zip(guild_ids, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"    ↳ {guild_id}: Refresh after YouTube sync failed: {result!r}")
+        # videos.list costs 1 quota unit per request, whatever the number of IDs and parts, retries and failed
+        # requests included. Lookups from commands running meanwhile are counted too.
+        sent = client.requests - sent
+        self.logger.info(
+            f"<Synced {updated} events in {len(guild_ids)} guilds with {len(videos)} videos in "
+            f"{time.perf_counter() - start:.2f}s, {sent} videos.list requests ({sent} quota units).>"
+        )
+
+    @sync_youtube_events.before_loop
+    async def before_sync_youtube_events(self):
         await self.client.wait_until_ready()
 
     # ===============
@@ -187,8 +387,8 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                 editor_role_id_array=[]
             )
             await self.db.create_guild(guild)
-        await self.update_schedule_messages(guild.guild_id)
         await interaction.edit_original_response(content=f"{YES}Done.")
+        self.refresh_in_background(interaction)
 
     # ============================
     # /schedule config SUBCOMMANDS
@@ -197,14 +397,14 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     class Config(app_commands.Group):
         def __init__(self, parent_cog):
             super().__init__(description="A description")
-            self.db = ScheduleDB()
+            self.db = get_schedule_db()
             self.parent_cog: Schedule = parent_cog
 
         @app_commands.command(description=desc.cmd_config_status)
         @guild_registered()
         @author_is_admin()
         async def status(self, interaction: discord.Interaction):
-            guild = await self.db.get_guild(interaction.guild.id)
+            guild = await schedule_context(interaction).guild()
             content = f"## Schedule configurations for __{interaction.guild.name}__:\n"
             if guild.schedule_channel_id:
                 content += f"- **Schedule Channel**: <#{guild.schedule_channel_id}>\n"
@@ -232,7 +432,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             await interaction.response.send_message(
                 f"{YES}The **Schedule** feature has been **enabled** for this server.", ephemeral=True
             )
-            await self.parent_cog.update_schedule_messages(interaction.guild.id)
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(description=desc.cmd_config_disable)
         @guild_registered()
@@ -244,7 +444,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             await interaction.response.send_message(
                 f"{YES}The **Schedule** feature has been **disabled** for this server.", ephemeral=True
             )
-            await self.parent_cog.update_schedule_messages(interaction.guild.id)
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(name="description", description=desc.cmd_config_desc)
         @app_commands.describe(description=desc.description)
@@ -264,7 +464,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                  f"\n\n> {description}" if description else
                  f"{YES}The **description** of the schedule has been reset."), ephemeral=True
             )
-            await self.parent_cog.update_schedule_messages(interaction.guild.id)
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(description=desc.cmd_config_talent)
         @app_commands.describe(talent=desc.talent)
@@ -283,7 +483,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                 (f"{YES}The **talent** of the schedule has been updated to:\n\n> {talent}" if talent else
                  f"{YES}The **talent** of the schedule has been reset."), ephemeral=True
             )
-            await self.parent_cog.update_schedule_messages(interaction.guild.id)
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(name="editor-add", description=desc.cmd_config_editor_add)
         @app_commands.describe(editor=desc.editor_role)
@@ -292,7 +492,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
         @guild_enabled()
         @author_is_admin()
         async def editor_add(self, interaction: discord.Interaction, editor: discord.Role):
-            editors = (await self.db.get_guild(interaction.guild.id)).editor_role_id_array
+            editors = (await schedule_context(interaction).guild()).editor_role_id_array
             if editor.id not in editors:
                 await self.db.set_guild_editors(interaction.guild.id, editors + [editor.id])
                 # noinspection PyUnresolvedReferences
@@ -312,7 +512,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
         @guild_enabled()
         @author_is_admin()
         async def editor_remove(self, interaction: discord.Interaction, editor: discord.Role = None):
-            editors = (await self.db.get_guild(interaction.guild.id)).editor_role_id_array
+            editors = (await schedule_context(interaction).guild()).editor_role_id_array
             if editor:
                 if editor.id in editors:
                     editors.remove(editor.id)
@@ -335,29 +535,77 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                     f"{YES}The **schedule editor roles** have been reset.", ephemeral=True
                 )
 
+        async def confirm_reset(self, interaction: discord.Interaction, prompt: str) -> bool:
+            """
+            Asks for confirmation before a reset. The confirmation message is left for the caller to edit if the
+            reset is confirmed, otherwise it is edited to say the reset was cancelled.
+
+            :param interaction: The interaction of the reset command.
+            :param prompt: What will be reset.
+            :return: Whether the reset was confirmed.
+            """
+            class ResetConfirmation(View):
+                def __init__(self):
+                    super().__init__(timeout=120)
+                    self.reset = None
+
+                @button(label='Reset', style=discord.ButtonStyle.red)
+                async def confirm(self, *_):
+                    self.reset = True
+                    self.stop()
+
+                @button(label='Cancel', style=discord.ButtonStyle.secondary)
+                async def cancel(self, *_):
+                    self.reset = False
+                    self.stop()
+
+            view = ResetConfirmation()
+            # noinspection PyUnresolvedReferences
+            await interaction.response.send_message(
+                f"{WARNING}**Are you sure you want to reset {prompt}?** This cannot be undone.",
+                view=view, ephemeral=True
+            )
+            timeout = await view.wait()
+            if timeout:
+                await interaction.edit_original_response(content=f"{CANCELLED}**Timed out.**", view=None)
+            elif not view.reset:
+                await interaction.edit_original_response(content=f"{CANCELLED}**Cancelled.**", view=None)
+            return not timeout and view.reset
+
         @app_commands.command(name="reset-all", description=desc.cmd_config_reset_all)
         @guild_registered()
         @author_is_admin()
         async def reset_all(self, interaction: discord.Interaction):
-            # TODO
-            # noinspection PyUnresolvedReferences
-            await interaction.response.send_message(f"{NO}**Not implemented yet.**", ephemeral=True)
+            if not await self.confirm_reset(
+                    interaction, "**all events** and the **configurations** (the schedule channel is kept)"
+            ):
+                return
+            deleted = await self.db.delete_guild_events(interaction.guild.id)
+            await self.db.reset_guild_config(interaction.guild.id)
+            await interaction.edit_original_response(
+                content=f"{YES}**Configurations reset and {deleted} events deleted.**", view=None
+            )
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(name="reset-config", description=desc.cmd_config_reset_config)
         @guild_registered()
         @author_is_admin()
         async def reset_config(self, interaction: discord.Interaction):
-            # TODO
-            # noinspection PyUnresolvedReferences
-            await interaction.response.send_message(f"{NO}**Not implemented yet.**", ephemeral=True)
+            if not await self.confirm_reset(interaction, "the **configurations** (the schedule channel is kept)"):
+                return
+            await self.db.reset_guild_config(interaction.guild.id)
+            await interaction.edit_original_response(content=f"{YES}**Configurations reset.**", view=None)
+            self.parent_cog.refresh_in_background(interaction)
 
         @app_commands.command(name="reset-events", description=desc.cmd_config_reset_events)
         @guild_registered()
         @author_is_admin()
         async def reset_events(self, interaction: discord.Interaction):
-            # TODO
-            # noinspection PyUnresolvedReferences
-            await interaction.response.send_message(f"{NO}**Not implemented yet.**", ephemeral=True)
+            if not await self.confirm_reset(interaction, "**all events**"):
+                return
+            deleted = await self.db.delete_guild_events(interaction.guild.id)
+            await interaction.edit_original_response(content=f"{YES}**{deleted} events deleted.**", view=None)
+            self.parent_cog.refresh_in_background(interaction)
 
     # =============
     # /schedule add
@@ -399,7 +647,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             await interaction.response.send_message(f"{YES}**Event `{event.event_id}` created.**", ephemeral=True)
         except discord.InteractionResponded:
             await interaction.edit_original_response(content=f"{YES}**Event `{event.event_id}` created.**")
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ================
     # /schedule add-yt
@@ -421,6 +669,175 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                 content=f"{NO}**Invalid option.** Use \"Use all\" when adding events using /schedule add-yt."
             )
 
+    # ==========================
+    # /schedule bulk SUBCOMMANDS
+    # ==========================
+    @app_commands.default_permissions(send_messages=True)
+    class Bulk(app_commands.Group):
+        def __init__(self, parent_cog):
+            super().__init__(description=desc.cmd_bulk)
+            self.db = get_schedule_db()
+            self.parent_cog: Schedule = parent_cog
+
+        async def set_stashed(self, interaction: discord.Interaction, event_ids: str, stashed: bool) -> None:
+            event_ids = parse_event_ids(event_ids)
+            found = await self.db.set_events_stashed(interaction.guild.id, event_ids, stashed)
+            action = "stashed" if stashed else "unstashed"
+            # noinspection PyUnresolvedReferences
+            await interaction.response.send_message(
+                f"{YES}**{found} of {len(event_ids)} events {action}.**" if found else f"{NO}**No events found.**",
+                ephemeral=True
+            )
+            if found:
+                self.parent_cog.refresh_in_background(interaction)
+
+        @app_commands.command(description=desc.cmd_bulk_stash)
+        @app_commands.describe(event_ids=desc.event_ids)
+        @app_commands.rename(event_ids="ids")
+        @guild_registered()
+        @guild_enabled()
+        @author_is_editor()
+        async def stash(self, interaction: discord.Interaction, event_ids: str):
+            await self.set_stashed(interaction, event_ids, True)
+
+        @app_commands.command(description=desc.cmd_bulk_unstash)
+        @app_commands.describe(event_ids=desc.event_ids)
+        @app_commands.rename(event_ids="ids")
+        @guild_registered()
+        @guild_enabled()
+        @author_is_editor()
+        async def unstash(self, interaction: discord.Interaction, event_ids: str):
+            await self.set_stashed(interaction, event_ids, False)
+
+        @app_commands.command(description=desc.cmd_bulk_delete)
+        @app_commands.describe(event_ids=desc.event_ids)
+        @app_commands.rename(event_ids="ids")
+        @guild_registered()
+        @guild_enabled()
+        @author_is_editor()
+        async def delete(self, interaction: discord.Interaction, event_ids: str):
+            event_ids = parse_event_ids(event_ids)
+
+            class DeleteConfirmation(View):
+                def __init__(self):
+                    super().__init__(timeout=120)
+                    self.delete = None
+
+                @button(label='Delete', style=discord.ButtonStyle.red)
+                async def delete(self, *_):
+                    self.delete = True
+                    self.stop()
+
+                @button(label='Cancel', style=discord.ButtonStyle.secondary)
+                async def cancel(self, *_):
+                    self.delete = False
+                    self.stop()
+
+            view = DeleteConfirmation()
+            # noinspection PyUnresolvedReferences
+            await interaction.response.send_message(
+                f"{WARNING}**Are you sure you want to delete {len(event_ids)} events?**\n"
+                + ", ".join(f"`{event_id}`" for event_id in event_ids),
+                view=view, ephemeral=True
+            )
+            timeout = await view.wait()
+            if timeout:
+                await interaction.edit_original_response(content=f"{CANCELLED}**Timed out.**", view=None)
+            elif not view.delete:
+                await interaction.edit_original_response(content=f"{CANCELLED}**Cancelled.**", view=None)
+            else:
+                deleted = await self.db.delete_events(interaction.guild.id, event_ids)
+                await interaction.edit_original_response(
+                    content=f"{YES}**{deleted} of {len(event_ids)} events deleted.**", view=None
+                )
+                if deleted:
+                    self.parent_cog.refresh_in_background(interaction)
+
+        @app_commands.command(description=desc.cmd_bulk_shift)
+        @app_commands.describe(amount=desc.shift_amount, unit=desc.shift_unit)
+        @guild_registered()
+        @guild_enabled()
+        @author_is_editor()
+        async def shift(
+                self, interaction: discord.Interaction, amount: int, unit: Literal["hours", "days"] = "days"
+        ):
+            if not amount:
+                raise InvalidArgument("The amount must not be 0.")
+            moved = await self.db.shift_future_events(interaction.guild.id, timedelta(**{unit: amount}))
+            # noinspection PyUnresolvedReferences
+            await interaction.response.send_message(
+                f"{YES}**{moved} future events moved by {amount:+} {unit}.**" if moved else
+                f"{NO}**No future events to move.**", ephemeral=True
+            )
+            if moved:
+                self.parent_cog.refresh_in_background(interaction)
+
+    # ================
+    # /schedule import
+    # ================
+    @app_commands.command(name="import", description=desc.cmd_import)
+    @app_commands.describe(file=desc.import_file)
+    @app_commands.default_permissions(send_messages=True)
+    @guild_registered()
+    @guild_enabled()
+    @author_is_editor()
+    async def import_events(self, interaction: discord.Interaction, file: Optional[discord.Attachment] = None):
+        if file:
+            if file.size > IMPORT_MAX_BYTES:
+                raise InvalidArgument(f"File too large. Max {IMPORT_MAX_BYTES // 1024} KiB.")
+            try:
+                content = (await file.read()).decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise InvalidArgument("Bad file. Imports must be UTF-8 text.")
+            await self.create_imported_events(interaction, content)
+            return
+
+        schedule_cog = self
+
+        class ImportModal(Modal, title="Import events"):
+            events = TextInput(
+                label="Events (title,date,time,type,note,url)",
+                style=discord.TextStyle.paragraph,
+                placeholder="Karaoke,7/12,20:00,stream\nNew song,7/15,,release,,https://example.com",
+                max_length=4000
+            )
+
+            async def on_submit(self, modal_interaction: discord.Interaction):
+                await schedule_cog.create_imported_events(modal_interaction, self.events.value)
+
+            async def on_error(self, modal_interaction: discord.Interaction, error: Exception):
+                if not isinstance(error, AppCommandError):
+                    schedule_cog.logger.exception(error)
+                error_message = getattr(error, "message", "Something went wrong.")
+                # noinspection PyUnresolvedReferences
+                await modal_interaction.response.send_message(
+                    f"{NO}**Command `/schedule import` failed**:\n```{error_message}```", ephemeral=True
+                )
+
+        # noinspection PyUnresolvedReferences
+        await interaction.response.send_modal(ImportModal())
+
+    async def create_imported_events(self, interaction: discord.Interaction, content: str) -> None:
+        """
+        Validates every event of an import, then creates all of them with one ID allocation and one insert, and
+        refreshes the schedule once.
+
+        :param interaction: The interaction to respond to.
+        :param content: The CSV or JSON text of the import.
+        :return: None
+        """
+        events = parse_import(content, interaction.guild.id)
+        event_ids = await self.db.allocate_event_ids(interaction.guild.id, len(events))
+        for event, event_id in zip(events, event_ids):
+            event.event_id = event_id
+        await self.db.create_events(events)
+        # noinspection PyUnresolvedReferences
+        await interaction.response.send_message(
+            f"{YES}**{len(events)} event{'s' if len(events) != 1 else ''} imported**: "
+            + ", ".join(f"`{event.event_id}`" for event in events), ephemeral=True
+        )
+        self.refresh_in_background(interaction)
+
     # ==============
     # /schedule edit
     # ==============
@@ -442,28 +859,26 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             note: str = "",
             event_type: str = "",
     ) -> None:
-        event = await self.db.get_event(interaction.guild.id, event_id)
-        datetime = None
-        granularity = None
+        # Only the given fields change, in one update
+        changes = {}
         if date:
             datetime, granularity = parse_date(date)
             if datetime:
-                datetime = parse_time(time, datetime)
+                changes["datetime"] = parse_time(time, datetime)
+            if granularity:
+                changes["datetime_granularity"] = granularity
         if event_type:
             event_type = parse_type(event_type)
-        await self.db.update_event(Event(
-            guild_id=interaction.guild.id,
-            event_id=event.event_id,
-            title=title or event.title,
-            datetime=datetime or event.datetime,
-            datetime_granularity=granularity or event.datetime_granularity,
-            type=event_type or event.type,
-            note=note or event.note,
-            url=url or event.url
-        ))
+        for name, value in [("title", title), ("type", event_type), ("note", note), ("url", url)]:
+            if value:
+                changes[name] = value
+        if url:
+            changes["youtube_start"] = None  # A newly linked video given as URL only does not move the event
+        if changes:
+            await schedule_context(interaction).update_event(event_id, **changes)
         # noinspection PyUnresolvedReferences
         await interaction.response.send_message(f"{YES}**Event `{event_id}` updated**.", ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ================
     # /schedule delete
@@ -504,7 +919,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
             if view.delete:
                 await self.db.delete_event(interaction.guild.id, event_id)
                 await interaction.edit_original_response(content=f"{YES}**Event `{event_id}` deleted.**", view=None)
-                await self.update_schedule_messages(interaction.guild.id)
+                self.refresh_in_background(interaction)
             else:
                 await interaction.edit_original_response(content=f"{CANCELLED}**Cancelled.**", view=None)
         else:
@@ -522,15 +937,15 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def stash_event(self, interaction: discord.Interaction, event_id: str):
-        event = await self.db.get_event(interaction.guild.id, event_id)
+        event = await schedule_context(interaction).event(event_id)
         if event.stashed:
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{NO}**Event is already stashed.**", ephemeral=True)
         else:
-            await self.db.set_event_stashed(interaction.guild.id, event_id, True)
+            await schedule_context(interaction).update_event(event_id, stashed=True)
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Event `{event_id}` stashed.**", ephemeral=True)
-            await self.update_schedule_messages(interaction.guild.id)
+            self.refresh_in_background(interaction)
 
     # =================
     # /schedule unstash
@@ -544,15 +959,15 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def unstash_event(self, interaction: discord.Interaction, event_id: str):
-        event = await self.db.get_event(interaction.guild.id, event_id)
+        event = await schedule_context(interaction).event(event_id)
         if not event.stashed:
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{NO}**Event is not stashed.**", ephemeral=True)
         else:
-            await self.db.set_event_stashed(interaction.guild.id, event_id, False)
+            await schedule_context(interaction).update_event(event_id, stashed=False)
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Event `{event_id}` unstashed.**", ephemeral=True)
-            await self.update_schedule_messages(interaction.guild.id)
+            self.refresh_in_background(interaction)
 
     # ===============
     # /schedule title
@@ -566,10 +981,10 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def set_event_title(self, interaction: discord.Interaction, event_id: str, title: str):
-        await self.db.set_event_title(interaction.guild.id, event_id, title)
+        await schedule_context(interaction).update_event(event_id, title=title)
         # noinspection PyUnresolvedReferences
         await interaction.response.send_message(f"{YES}**Title of event `{event_id}` edited.**", ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # =============
     # /schedule url
@@ -583,7 +998,8 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def set_event_url(self, interaction: discord.Interaction, event_id: str, url: str = ""):
-        await self.db.set_event_url(interaction.guild.id, event_id, url)
+        # A newly linked video does not move the event, as in /schedule edit
+        await schedule_context(interaction).update_event(event_id, url=url, youtube_start=None)
         try:
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(
@@ -595,7 +1011,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
                 content=f"{YES}**URL of event `{event_id}` edited.**" if url else
                 f"{YES}**URL of event `{event_id}` removed.**"
             )
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ==============
     # /schedule note
@@ -609,14 +1025,14 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def set_event_note(self, interaction: discord.Interaction, event_id: str, note: str = ""):
-        await self.db.set_event_note(interaction.guild.id, event_id, note)
+        await schedule_context(interaction).update_event(event_id, note=note)
         if note:
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Note of event `{event_id}` edited.**", ephemeral=True)
         else:
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Note of event `{event_id}` removed.**", ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ==============
     # /schedule date
@@ -632,19 +1048,21 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     async def set_event_date(self, interaction: discord.Interaction, event_id: str, date: str = ""):
         if date:
             datetime, granularity = parse_date(date)
-            event_datetime = (await self.db.get_event(interaction.guild.id, event_id)).datetime
+            event_datetime = (await schedule_context(interaction).event(event_id)).datetime
             if event_datetime.hour != 23 and event_datetime.month != 59 and event_datetime.second != 59:
                 datetime = parse_time(event_datetime.strftime("%H:%M:%S"), datetime)
-            await self.db.set_event_datetime(interaction.guild.id, event_id, datetime)
-            await self.db.set_event_datetime_granularity(interaction.guild.id, event_id, granularity)
+            await schedule_context(interaction).update_event(
+                event_id, datetime=datetime, datetime_granularity=granularity
+            )
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Date of event `{event_id}` edited.**", ephemeral=True)
         else:
-            await self.db.set_event_datetime(interaction.guild.id, event_id, None)
-            await self.db.set_event_datetime_granularity(interaction.guild.id, event_id, DatetimeGranularity())
+            await schedule_context(interaction).update_event(
+                event_id, datetime=None, datetime_granularity=DatetimeGranularity()
+            )
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Date of event `{event_id}` removed.**", ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ==============
     # /schedule time
@@ -658,18 +1076,18 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @author_is_editor()
     @validate_arguments
     async def set_event_time(self, interaction: discord.Interaction, event_id: str, time: str = ""):
-        current_datetime = (await self.db.get_event(interaction.guild.id, event_id)).datetime
+        current_datetime = (await schedule_context(interaction).event(event_id)).datetime
         if time:
             datetime = parse_time(time, current_datetime)
-            await self.db.set_event_datetime(interaction.guild.id, event_id, datetime)
+            await schedule_context(interaction).update_event(event_id, datetime=datetime)
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Time of event `{event_id}` edited.**", ephemeral=True)
         else:
             datetime, _ = parse_date(current_datetime.strftime("%Y/%m/%d"))
-            await self.db.set_event_datetime(interaction.guild.id, event_id, datetime)
+            await schedule_context(interaction).update_event(event_id, datetime=datetime)
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Time of event `{event_id}` removed.**", ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # ==============
     # /schedule type
@@ -685,16 +1103,16 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @validate_arguments
     async def set_event_type(self, interaction: discord.Interaction, event_id: str, event_type: str = ""):
         if event_type:
-            await self.db.set_event_type(interaction.guild.id, event_id, parse_type(event_type))
+            await schedule_context(interaction).update_event(event_id, type=parse_type(event_type))
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(f"{YES}**Type of event `{event_id}` edited.**", ephemeral=True)
         else:
-            await self.db.set_event_type(interaction.guild.id, event_id, 4)
+            await schedule_context(interaction).update_event(event_id, type=4)
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(
                 f"{YES}**Type of event `{event_id}` set to `other`.**", ephemeral=True
             )
-        await self.update_schedule_messages(interaction.guild.id)
+        self.refresh_in_background(interaction)
 
     # =================
     # /schedule refresh
@@ -707,7 +1125,7 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     async def refresh_schedule(self, interaction: discord.Interaction):
         # noinspection PyUnresolvedReferences
         await interaction.response.defer(ephemeral=True)
-        await self.update_schedule_messages(interaction.guild.id)
+        await self.request_refresh(interaction.guild.id, force=True)
         await interaction.followup.send(content=f"{YES}**Schedule refreshed.**")
 
     # =================
@@ -717,8 +1135,62 @@ class Schedule(GroupCog, name="schedule", description="Commands under the schedu
     @app_commands.default_permissions(send_messages=True)
     @guild_registered()
     async def history(self, interaction: discord.Interaction):
+        content, view = await self.history_page(interaction.guild.id)
+        # noinspection PyUnresolvedReferences
+        await interaction.response.send_message(content, view=view, ephemeral=True)
+
+    @GroupCog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        if interaction.type is not discord.InteractionType.component or not interaction.guild:
+            return
+        page = parse_history_cursor_id(interaction.data.get("custom_id", ""))
+        if not page:
+            return
+        newer, cursor = page
+        try:
+            content, view = await self.history_page(interaction.guild.id, cursor, newer)
+        except Exception as e:
+            self.logger.exception(f"History page of guild {interaction.guild.id} failed to load: {e}")
+            # noinspection PyUnresolvedReferences
+            return await interaction.response.send_message(f"{NO}**Could not load the page.**", ephemeral=True)
         # noinspection PyUnresolvedReferences
-        await interaction.response.send_message(f"{NO}**Command not implemented.**", ephemeral=True)
+        await interaction.response.edit_message(content=content, view=view)
+
+    async def history_page(
+            self, guild_id: int, cursor: Optional[Tuple] = None, newer: bool = False
+    ) -> Tuple[str, Optional[View]]:
+        """
+        Renders one page of a guild's event history, along with the buttons to the neighbouring pages. The buttons
+        carry their page's cursor in their custom ID and are answered by on_interaction(), so open history messages
+        cost no memory and keep working across restarts.
+
+        :param guild_id: The ID of the guild.
+        :param cursor: See AbstractScheduleDB.get_event_history(), None for the most recent page.
+        :param newer: See AbstractScheduleDB.get_event_history().
+        :return: The page's content and buttons.
+        """
+        # One extra event tells whether there's another page in that direction
+        events = await self.db.get_event_history(guild_id, HISTORY_PAGE_SIZE + 1, cursor, newer)
+        if not events and cursor:
+            # The events the cursor pointed at are gone, start over from the most recent page
+            return await self.history_page(guild_id)
+        more = len(events) > HISTORY_PAGE_SIZE
+        events = events[-HISTORY_PAGE_SIZE:] if newer else events[:HISTORY_PAGE_SIZE]
+        content = "\n".join(render_history(events))
+        if not events:
+            return content, None
+        view = View(timeout=None)
+        view.add_item(Button(
+            label="Newer", emoji="◀️", custom_id=history_cursor_id(events[0], newer=True),
+            disabled=not (more if newer else cursor is not None)
+        ))
+        view.add_item(Button(
+            label="Older", emoji="▶️", custom_id=history_cursor_id(events[-1], newer=False),
+            disabled=not (newer or more)
+        ))
+        # A finished view is sent as plain components and never registered with the client
+        view.stop()
+        return content, view
 
 
 async def setup(client: Onigiri):
@@ -728,3 +1200,4 @@ async def setup(client: Onigiri):
         if isinstance(cmd, discord.app_commands.Group):
             if cmd.name == "schedule":
                 cmd.add_command(schedule.Config(parent_cog=schedule))
+                cmd.add_command(schedule.Bulk(parent_cog=schedule))
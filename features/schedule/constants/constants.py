@@ -1,6 +1,51 @@
 import pytz
 
-__all__ = ["JST", "MONTHS"]
+__all__ = ["JST", "MONTHS", "GUILD_CACHE_SIZE", "ENABLED_GUILDS_TTL", "EVENT_CACHE_SIZE", "EVENT_LOOKUP_CACHE_SIZE",
+           "REFRESHED_RESOLUTION", "REFRESH_CONCURRENCY", "GUILD_REFRESH_TIMEOUT", "SAFETY_NET_REFRESH_MINUTES",
+           "REFRESH_DEBOUNCE", "PAST_EVENTS_DISPLAYED", "ARCHIVE_AFTER_DAYS", "ARCHIVE_BATCH_SIZE",
+           "ARCHIVE_INTERVAL_HOURS", "IMPORT_MAX_EVENTS", "IMPORT_MAX_BYTES", "BULK_MAX_EVENTS", "HISTORY_PAGE_SIZE",
+           "EXPORT_BATCH_SIZE", "YOUTUBE_SYNC_INTERVAL_MINUTES", "YOUTUBE_SYNC_BATCH_SIZE"]
 
 JST = pytz.timezone("Asia/Tokyo")
 MONTHS = ["jan", 'feb', "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+# Maximum number of guild configs kept in memory by CachedScheduleDB
+GUILD_CACHE_SIZE = 1024
+# Seconds before the cached list of enabled guilds is re-read from the database
+ENABLED_GUILDS_TTL = 10 * 60
+# Maximum number of guilds whose schedule window is kept in memory by CachedScheduleDB
+EVENT_CACHE_SIZE = 256
+# Maximum number of single events kept in memory by CachedScheduleDB, for the commands that look one up
+EVENT_LOOKUP_CACHE_SIZE = 1024
+# Seconds the "Last refreshed" line is rounded down to, so unchanged schedules render identically and are not re-sent
+REFRESHED_RESOLUTION = 15 * 60
+# Maximum number of schedule channels refreshed at the same time by the auto-refresh loop
+REFRESH_CONCURRENCY = 8
+# Seconds a single guild's refresh may take before the auto-refresh loop gives up on it
+GUILD_REFRESH_TIMEOUT = 30
+# Minutes between full refreshes of every enabled guild, a safety net behind the boundary-driven refreshes
+SAFETY_NET_REFRESH_MINUTES = 30
+# Seconds a command's refresh waits for further edits to the same guild, so bursts of commands render only once
+REFRESH_DEBOUNCE = 1.5
+# Number of most recent past events shown on the schedule
+PAST_EVENTS_DISPLAYED = 3
+# Days after which past events beyond the schedule's past section move to the archive
+ARCHIVE_AFTER_DAYS = 180
+# Maximum number of events moved to the archive per round trip
+ARCHIVE_BATCH_SIZE = 500
+# Hours between runs of the archive job
+ARCHIVE_INTERVAL_HOURS = 6
+# Maximum number of events a single /schedule import can create
+IMPORT_MAX_EVENTS = 100
+# Maximum size of a file attached to /schedule import
+IMPORT_MAX_BYTES = 256 * 1024
+# Maximum number of event IDs a single /schedule bulk command accepts
+BULK_MAX_EVENTS = 100
+# Number of events on one page of /schedule history
+HISTORY_PAGE_SIZE = 8
+# Number of events read per round trip when streaming events out of the database
+EXPORT_BATCH_SIZE = 1000
+# Minutes between runs of the job syncing YouTube-linked events with their videos
+YOUTUBE_SYNC_INTERVAL_MINUTES = 30
+# Number of videos per videos.list call of the YouTube sync, the most the API accepts
+YOUTUBE_SYNC_BATCH_SIZE = 50
@@ -1,11 +1,20 @@
 import datetime
 from abc import abstractmethod
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Tuple, AsyncIterator
 
-from features.schedule.models import Event, DatetimeGranularity, GuildScheduleConfig
+from features.schedule.constants import EXPORT_BATCH_SIZE
+from features.schedule.models import Event, DatetimeGranularity, GuildScheduleConfig, ScheduleWindow
 
 
 class AbstractScheduleDB:
+    @abstractmethod
+    async def ensure_indexes(self) -> List[str]:
+        """
+        Creates the indexes the schedule queries rely on, if they do not exist yet.
+
+        :return: List[str] of the indexes that could not be created, e.g. unique indexes over duplicate data.
+        """
+
     @abstractmethod
     async def get_guild_exists(self, guild_id: int) -> bool:
         """
@@ -34,6 +43,18 @@ class AbstractScheduleDB:
         :return: str
         """
 
+    @abstractmethod
+    async def allocate_event_ids(self, guild_id: int, n: int) -> List[str]:
+        """
+        Takes `n` unused event IDs from a guild's pool, in one round trip. A refill of the pool can race an allocation
+        whose event is not inserted yet and hand its ID out again, create_event() and create_events() then give the
+        event another one.
+
+        :param guild_id: The ID of the guild to allocate event IDs for.
+        :param n: The number of IDs to allocate.
+        :return: List[str]
+        """
+
     @abstractmethod
     async def get_guild(self, guild_id: int) -> Optional[GuildScheduleConfig]:
         """
@@ -72,7 +93,7 @@ class AbstractScheduleDB:
     @abstractmethod
     async def get_all_events(self, guild_id: int) -> List[Event]:
         """
-        Gets all events for a guild.
+        Gets all events for a guild, archived ones included.
 
         :param guild_id: The ID of the guild.
         :return: List[Event]
@@ -81,12 +102,146 @@ class AbstractScheduleDB:
     @abstractmethod
     async def get_guild_events(self, guild_id: int) -> List[Event]:
         """
-        Gets all events for a guild.
+        Gets all events for a guild that are not archived.
 
         :param guild_id: The ID of the guild.
         :return: List[Event]
         """
 
+    @abstractmethod
+    async def get_youtube_events(self) -> List[Event]:
+        """
+        Gets the future events of every guild whose time follows the scheduled start of their YouTube video.
+
+        :return: List[Event]
+        """
+
+    @abstractmethod
+    def iter_events(
+            self, guild_id: Optional[int] = None, event_filter: Optional[dict] = None,
+            batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Event]:
+        """
+        Streams events, archived ones included, guild by guild and by event ID within a guild. Events are read in
+        batches, so memory use does not grow with the number of events.
+
+        :param guild_id: The ID of the guild whose events to stream, None for all guilds.
+        :param event_filter: An additional MongoDB filter on the events, None to stream them all.
+        :param batch_size: The number of events read per round trip.
+        :return: AsyncIterator[Event]
+        """
+
+    @abstractmethod
+    async def get_schedule_window(self, guild_id: int, past_limit: int) -> ScheduleWindow:
+        """
+        Gets only the events the rendered schedule shows: the most recent past events, every future event and every
+        event without a date, in one round trip.
+
+        :param guild_id: The ID of the guild.
+        :param past_limit: The number of most recent past events to return. Must be at least 1.
+        :return: ScheduleWindow
+        """
+
+    @abstractmethod
+    async def set_events_stashed(self, guild_id: int, event_ids: List[str], stashed: bool) -> int:
+        """
+        Stashes or unstashes many events in one update.
+
+        :param guild_id: The ID of the guild that the events are associated to.
+        :param event_ids: The IDs of the events.
+        :param stashed: Whether the events are stashed.
+        :return: The number of events found.
+        """
+
+    @abstractmethod
+    async def delete_events(self, guild_id: int, event_ids: List[str]) -> int:
+        """
+        Deletes many events in one round trip per collection.
+
+        :param guild_id: The ID of the guild that the events are associated to.
+        :param event_ids: The IDs of the events.
+        :return: The number of events deleted.
+        """
+
+    @abstractmethod
+    async def delete_guild_events(self, guild_id: int) -> int:
+        """
+        Deletes every event of a guild, archived ones included, and frees all of its event IDs.
+
+        :param guild_id: The ID of the guild.
+        :return: The number of events deleted.
+        """
+
+    @abstractmethod
+    async def reset_guild_config(self, guild_id: int) -> None:
+        """
+        Puts a guild's configs back to the defaults of a newly set up guild, in one update. The schedule channel and
+        messages are kept.
+
+        :param guild_id: The ID of the guild.
+        :return: None
+        """
+
+    @abstractmethod
+    async def shift_future_events(self, guild_id: int, delta: datetime.timedelta) -> int:
+        """
+        Moves every future event of a guild that has a day by `delta`, in one server-side update. Events without a
+        time only move if `delta` is a whole number of days.
+
+        :param guild_id: The ID of the guild.
+        :param delta: How far to move the events, negative to move them earlier.
+        :return: The number of events moved.
+        """
+
+    @abstractmethod
+    async def update_event_times(self, events: List[Event]) -> int:
+        """
+        Saves the datetime, video start and type of events, which may belong to different guilds, in one bulk write.
+        Other fields are left as they are.
+
+        :param events: The updated events.
+        :return: The number of events that changed.
+        """
+
+    @abstractmethod
+    async def backfill_youtube_starts(self) -> int:
+        """
+        Takes the current datetime as the video start of the future, timed YouTube events created before events kept
+        one, so the YouTube sync follows them too. Events that were already backfilled are not matched again.
+
+        :return: The number of events backfilled.
+        """
+
+    @abstractmethod
+    async def archive_events(self, guild_id: int, older_than: datetime.datetime, keep: int, batch_size: int) -> int:
+        """
+        Moves a guild's events that happened before `older_than` to the archive, in batches. The most recent `keep`
+        past events stay, so the schedule never shows an archived event. Archived events are still found by
+        get_event(), and move back when they are written to.
+
+        :param guild_id: The ID of the guild.
+        :param older_than: Events older than this are archived.
+        :param keep: The number of most recent past events to keep in any case. Must be at least 1.
+        :param batch_size: The number of events moved per round trip.
+        :return: The number of events archived.
+        """
+
+    @abstractmethod
+    async def get_event_history(
+            self, guild_id: int, limit: int, cursor: Optional[Tuple[datetime.datetime, str]] = None,
+            newer: bool = False
+    ) -> List[Event]:
+        """
+        Gets a page of a guild's past events, archived ones included, newest first. Pages are keyed on
+        (datetime, event_id): pass the first or last event of the current page as the cursor to get the next one.
+
+        :param guild_id: The ID of the guild.
+        :param limit: The number of events to get.
+        :param cursor: The (datetime, event_id) of the event the page starts after, None for the most recent events.
+        :param newer: Whether to get the events just newer than the cursor instead of the ones just older.
+        :return: List[Event]
+        """
+
     @abstractmethod
     async def create_guild(self, guild: GuildScheduleConfig) -> GuildScheduleConfig:
         """
@@ -99,10 +254,20 @@ class AbstractScheduleDB:
     @abstractmethod
     async def create_event(self, event: Event) -> Event:
         """
-        Creates an event for a guild.
+        Creates an event for a guild. If its ID turns out to be in use, the event gets a newly allocated one.
 
         :param event: Event
-        :return: Event
+        :return: Event, with the ID it was created under.
+        """
+
+    @abstractmethod
+    async def create_events(self, events: List[Event]) -> List[Event]:
+        """
+        Creates many events in one round trip. Their IDs must already be allocated, e.g. with allocate_event_ids().
+        Events whose ID turns out to be in use get a newly allocated one.
+
+        :param events: List[Event]
+        :return: List[Event], with the IDs they were created under.
         """
 
     @abstractmethod
@@ -210,6 +375,30 @@ class AbstractScheduleDB:
         :return: None
         """
 
+    @abstractmethod
+    async def set_guild_message_hashes(self, guild_id: int, hashes: Dict[str, str]) -> None:
+        """
+        Sets the hashes of the content last pushed to the schedule messages in the guild.
+
+        :param guild_id: The ID of the guild.
+        :param hashes: Content hashes keyed by the schedule message ID as a string.
+        :return: None
+        """
+
+    @abstractmethod
+    async def update_event_fields(
+            self, guild_id: int, event_id: str, return_event: bool = False, **changes
+    ) -> Optional[Event]:
+        """
+        Changes any combination of an event's fields atomically, in one round trip.
+
+        :param guild_id: The ID of the guild that the event is associated to.
+        :param event_id: The ID of the event.
+        :param return_event: Whether to return the event as it is after the update, saving a read.
+        :param changes: New values keyed by Event field name, e.g. `datetime=dt, datetime_granularity=dt_g`.
+        :return: Optional[Event], the updated event if `return_event` is set and the event exists, otherwise None.
+        """
+
     @abstractmethod
     async def set_event_title(self, guild_id: int, event_id: str, title: str) -> None:
         """
@@ -0,0 +1,348 @@
+import datetime
+import time
+from collections import defaultdict
+from copy import deepcopy
+from typing import Optional, Literal, List, Dict, Set, Callable, Tuple, AsyncIterator
+
+from features.schedule.constants import JST, GUILD_CACHE_SIZE, ENABLED_GUILDS_TTL, EVENT_CACHE_SIZE, \
+    EVENT_LOOKUP_CACHE_SIZE, EXPORT_BATCH_SIZE
+from features.schedule.models import Event, DatetimeGranularity, GuildScheduleConfig, ScheduleWindow
+from tools import LRUCache
+from .AbstractScheduleDB import AbstractScheduleDB
+
+_MISSING = object()
+# Event generation, past limit, moment the window goes stale and the window itself
+_CachedWindow = Tuple[int, int, Optional[datetime.datetime], ScheduleWindow]
+# Event generation and the event, None if it does not exist
+_CachedEvent = Tuple[int, Optional[Event]]
+
+
+class CachedScheduleDB(AbstractScheduleDB):
+    """
+    Wraps another AbstractScheduleDB and keeps guild configs in a bounded LRU cache. Writes go to the backend first
+    and are then applied to the cached copy, so reads almost never need a round trip.
+
+    Every write bumps a per-guild version. A read only fills the cache if no write to that guild finished while it
+    was waiting on the backend, so a slow read can never overwrite a newer config with an older one.
+
+    Schedule windows are cached the same way, keyed by a per-guild generation counter that every event write bumps.
+    A cached window is only served while its generation is still current and none of its future events has started.
+    Single events are cached under the same generations. Partial updates store the event the backend returns, so
+    the next command on the same event finds it without a read.
+    """
+
+    def __init__(
+            self, backend: AbstractScheduleDB,
+            max_guilds: int = GUILD_CACHE_SIZE,
+            enabled_ttl: float = ENABLED_GUILDS_TTL,
+            max_event_guilds: int = EVENT_CACHE_SIZE,
+            max_events: int = EVENT_LOOKUP_CACHE_SIZE
+    ):
+        self.backend = backend
+        self.guild_cache: LRUCache[int, Optional[GuildScheduleConfig]] = LRUCache(max_guilds)
+        self.enabled_ttl = enabled_ttl
+        self._guild_versions: Dict[int, int] = defaultdict(int)
+        self._guild_writes = 0
+        self._enabled_ids: Optional[Set[int]] = None
+        self._enabled_loaded_at = 0.0
+        self.window_cache: LRUCache[int, _CachedWindow] = LRUCache(max_event_guilds)
+        self.event_cache: LRUCache[Tuple[int, str], _CachedEvent] = LRUCache(max_events)
+        self._event_generations: Dict[int, int] = defaultdict(int)
+
+    async def ensure_indexes(self) -> List[str]:
+        return await self.backend.ensure_indexes()
+
+    # ==================
+    # Guild config cache
+    # ==================
+    def _fill_guild(self, guild_id: int, guild: Optional[GuildScheduleConfig], version: int) -> None:
+        if self._guild_versions[guild_id] == version:
+            self.guild_cache.put(guild_id, deepcopy(guild))
+
+    def _write_guild(self, guild_id: int, apply: Callable[[GuildScheduleConfig], None]) -> None:
+        self._guild_versions[guild_id] += 1
+        self._guild_writes += 1
+        cached = self.guild_cache.peek(guild_id)
+        if cached is not None:
+            apply(cached)
+
+    def _write_enabled(self, guild_id: int, enabled: bool) -> None:
+        self._write_guild(guild_id, lambda g: setattr(g, "enabled", enabled))
+        if self._enabled_ids is not None:
+            if enabled:
+                self._enabled_ids.add(guild_id)
+            else:
+                self._enabled_ids.discard(guild_id)
+
+    def _replace_guild(self, guild_id: int, guild: Optional[GuildScheduleConfig]) -> None:
+        self._guild_versions[guild_id] += 1
+        self._guild_writes += 1
+        self.guild_cache.put(guild_id, deepcopy(guild))
+        if self._enabled_ids is not None:
+            if guild and guild.enabled:
+                self._enabled_ids.add(guild_id)
+            else:
+                self._enabled_ids.discard(guild_id)
+
+    async def get_guild_exists(self, guild_id: int) -> bool:
+        return await self.get_guild(guild_id) is not None
+
+    async def get_guild(self, guild_id: int) -> Optional[GuildScheduleConfig]:
+        cached = self.guild_cache.get(guild_id, _MISSING)
+        if cached is not _MISSING:
+            return deepcopy(cached)
+        version = self._guild_versions[guild_id]
+        guild = await self.backend.get_guild(guild_id)
+        self._fill_guild(guild_id, guild, version)
+        return guild
+
+    async def get_all_guilds(self) -> List[GuildScheduleConfig]:
+        return await self.backend.get_all_guilds()
+
+    async def get_enabled_guilds(self) -> List[GuildScheduleConfig]:
+        if self._enabled_ids is not None and time.monotonic() - self._enabled_loaded_at < self.enabled_ttl:
+            guilds = [self.guild_cache.peek(guild_id) for guild_id in self._enabled_ids]
+            if all(guilds):
+                self.guild_cache.stats.hits += 1
+                return [deepcopy(guild) for guild in guilds]
+        self.guild_cache.stats.misses += 1
+        writes = self._guild_writes
+        guilds = await self.backend.get_enabled_guilds()
+        if self._guild_writes == writes:
+            for guild in guilds:
+                self.guild_cache.put(guild.guild_id, deepcopy(guild))
+            self._enabled_ids = {guild.guild_id for guild in guilds}
+            self._enabled_loaded_at = time.monotonic()
+        return guilds
+
+    async def create_guild(self, guild: GuildScheduleConfig) -> GuildScheduleConfig:
+        guild = await self.backend.create_guild(guild)
+        self._replace_guild(guild.guild_id, guild)
+        return guild
+
+    async def update_guild(self, guild: GuildScheduleConfig) -> GuildScheduleConfig:
+        guild = await self.backend.update_guild(guild)
+        self._replace_guild(guild.guild_id, guild)
+        return guild
+
+    async def delete_guild(self, guild_id: int) -> None:
+        await self.backend.delete_guild(guild_id)
+        self._replace_guild(guild_id, None)
+
+    async def set_guild_enable(self, guild_id: int) -> None:
+        await self.backend.set_guild_enable(guild_id)
+        self._write_enabled(guild_id, True)
+
+    async def set_guild_disable(self, guild_id: int) -> None:
+        await self.backend.set_guild_disable(guild_id)
+        self._write_enabled(guild_id, False)
+
+    async def set_guild_talent(self, guild_id: int, talent: str) -> None:
+        await self.backend.set_guild_talent(guild_id, talent)
+        self._write_guild(guild_id, lambda g: setattr(g, "talent", talent))
+
+    async def set_guild_description(self, guild_id: int, description: str) -> None:
+        await self.backend.set_guild_description(guild_id, description)
+        self._write_guild(guild_id, lambda g: setattr(g, "description", description))
+
+    async def set_guild_channel(self, guild_id: int, schedule_channel: int) -> None:
+        await self.backend.set_guild_channel(guild_id, schedule_channel)
+        self._write_guild(guild_id, lambda g: setattr(g, "schedule_channel_id", schedule_channel))
+
+    async def set_guild_messages(self, guild_id: int, schedule_messages: List[int]) -> None:
+        await self.backend.set_guild_messages(guild_id, schedule_messages)
+        self._write_guild(guild_id, lambda g: setattr(g, "schedule_message_id_array", list(schedule_messages)))
+
+    async def set_guild_editors(self, guild_id: int, editors: List[int]) -> None:
+        await self.backend.set_guild_editors(guild_id, editors)
+        self._write_guild(guild_id, lambda g: setattr(g, "editor_role_id_array", list(editors)))
+
+    async def set_guild_message_hashes(self, guild_id: int, hashes: Dict[str, str]) -> None:
+        await self.backend.set_guild_message_hashes(guild_id, hashes)
+        self._write_guild(guild_id, lambda g: setattr(g, "schedule_message_hashes", dict(hashes)))
+
+    # ======
+    # Events
+    # ======
+    def event_generation(self, guild_id: int) -> int:
+        """
+        Gets the current event generation of a guild. It changes every time any of the guild's events is written.
+
+        :param guild_id: The ID of the guild.
+        :return: int
+        """
+        return self._event_generations[guild_id]
+
+    def _bump_events(self, guild_id: int) -> None:
+        self._event_generations[guild_id] += 1
+
+    @staticmethod
+    def _window_current(cached: _CachedWindow, generation: int, past_limit: int) -> bool:
+        cached_generation, cached_limit, valid_until, _ = cached
+        if cached_generation != generation or cached_limit != past_limit:
+            return False
+        # The window shifts as soon as its next event starts
+        return valid_until is None or datetime.datetime.now(JST) < valid_until
+
+    async def get_event_exists(self, guild_id, event_id: str) -> bool:
+        return await self.backend.get_event_exists(guild_id, event_id)
+
+    async def get_available_event_id(self, guild_id) -> str:
+        return await self.backend.get_available_event_id(guild_id)
+
+    async def allocate_event_ids(self, guild_id: int, n: int) -> List[str]:
+        return await self.backend.allocate_event_ids(guild_id, n)
+
+    def _fill_event(self, guild_id: int, event_id: str, event: Optional[Event], generation: int) -> None:
+        if self._event_generations[guild_id] == generation:
+            self.event_cache.put((guild_id, event_id), (generation, deepcopy(event)))
+
+    async def get_event(self, guild_id: int, event_id: str) -> Optional[Event]:
+        generation = self._event_generations[guild_id]
+        cached = self.event_cache.peek((guild_id, event_id))
+        if cached is not None and cached[0] != generation:
+            self.event_cache.pop((guild_id, event_id))
+        if cached := self.event_cache.get((guild_id, event_id)):
+            return deepcopy(cached[1])
+        event = await self.backend.get_event(guild_id, event_id)
+        self._fill_event(guild_id, event_id, event, generation)
+        return event
+
+    async def get_all_events(self, guild_id: int) -> List[Event]:
+        return await self.backend.get_all_events(guild_id)
+
+    async def get_youtube_events(self) -> List[Event]:
+        return await self.backend.get_youtube_events()
+
+    async def iter_events(
+            self, guild_id: Optional[int] = None, event_filter: Optional[dict] = None,
+            batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Event]:
+        async for event in self.backend.iter_events(guild_id, event_filter, batch_size):
+            yield event
+
+    async def get_guild_events(self, guild_id: int) -> List[Event]:
+        return await self.backend.get_guild_events(guild_id)
+
+    async def get_schedule_window(self, guild_id: int, past_limit: int) -> ScheduleWindow:
+        generation = self._event_generations[guild_id]
+        cached = self.window_cache.peek(guild_id)
+        if cached is not None and not self._window_current(cached, generation, past_limit):
+            self.window_cache.pop(guild_id)
+        if cached := self.window_cache.get(guild_id):
+            return deepcopy(cached[3])
+        window = await self.backend.get_schedule_window(guild_id, past_limit)
+        if self._event_generations[guild_id] == generation:
+            valid_until = min((event.datetime for event in window.upcoming if event.datetime), default=None)
+            self.window_cache.put(guild_id, (generation, past_limit, valid_until, deepcopy(window)))
+        return window
+
+    async def set_events_stashed(self, guild_id: int, event_ids: List[str], stashed: bool) -> int:
+        found = await self.backend.set_events_stashed(guild_id, event_ids, stashed)
+        self._bump_events(guild_id)
+        return found
+
+    async def delete_events(self, guild_id: int, event_ids: List[str]) -> int:
+        deleted = await self.backend.delete_events(guild_id, event_ids)
+        self._bump_events(guild_id)
+        return deleted
+
+    async def delete_guild_events(self, guild_id: int) -> int:
+        deleted = await self.backend.delete_guild_events(guild_id)
+        self._bump_events(guild_id)
+        self.window_cache.pop(guild_id)
+        return deleted
+
+    async def reset_guild_config(self, guild_id: int) -> None:
+        await self.backend.reset_guild_config(guild_id)
+        # A reset guild is enabled again, the rest is re-read on next use
+        self._write_enabled(guild_id, True)
+        self.guild_cache.pop(guild_id)
+
+    async def shift_future_events(self, guild_id: int, delta: datetime.timedelta) -> int:
+        moved = await self.backend.shift_future_events(guild_id, delta)
+        self._bump_events(guild_id)
+        return moved
+
+    async def update_event_times(self, events: List[Event]) -> int:
+        changed = await self.backend.update_event_times(events)
+        for guild_id in {event.guild_id for event in events}:
+            self._bump_events(guild_id)
+        return changed
+
+    async def backfill_youtube_starts(self) -> int:
+        backfilled = await self.backend.backfill_youtube_starts()
+        if backfilled:
+            # The guilds are not known, the schedules render the same but cached events lack their video start
+            self.event_cache.clear()
+        return backfilled
+
+    async def archive_events(self, guild_id: int, older_than: datetime.datetime, keep: int, batch_size: int) -> int:
+        archived = await self.backend.archive_events(guild_id, older_than, keep, batch_size)
+        if archived:
+            self._bump_events(guild_id)
+        return archived
+
+    async def get_event_history(
+            self, guild_id: int, limit: int, cursor: Optional[Tuple[datetime.datetime, str]] = None,
+            newer: bool = False
+    ) -> List[Event]:
+        return await self.backend.get_event_history(guild_id, limit, cursor, newer)
+
+    async def create_event(self, event: Event) -> Event:
+        event = await self.backend.create_event(event)
+        self._bump_events(event.guild_id)
+        return event
+
+    async def create_events(self, events: List[Event]) -> List[Event]:
+        events = await self.backend.create_events(events)
+        for guild_id in {event.guild_id for event in events}:
+            self._bump_events(guild_id)
+        return events
+
+    async def update_event(self, event: Event) -> Event:
+        event = await self.backend.update_event(event)
+        self._bump_events(event.guild_id)
+        return event
+
+    async def delete_event(self, guild_id: int, event_id: str) -> None:
+        await self.backend.delete_event(guild_id, event_id)
+        self._bump_events(guild_id)
+
+    async def update_event_fields(
+            self, guild_id: int, event_id: str, return_event: bool = False, **changes
+    ) -> Optional[Event]:
+        # The updated event is always asked for, it is what the next command on this event reads
+        event = await self.backend.update_event_fields(guild_id, event_id, True, **changes)
+        self._bump_events(guild_id)
+        if event:
+            self._fill_event(guild_id, event_id, event, self._event_generations[guild_id])
+        return event if return_event else None
+
+    async def set_event_title(self, guild_id: int, event_id: str, title: str) -> None:
+        await self.backend.set_event_title(guild_id, event_id, title)
+        self._bump_events(guild_id)
+
+    async def set_event_datetime(self, guild_id: int, event_id: str, dt: Optional[datetime.datetime]) -> None:
+        await self.backend.set_event_datetime(guild_id, event_id, dt)
+        self._bump_events(guild_id)
+
+    async def set_event_datetime_granularity(self, guild_id: int, event_id: str, dt_g: DatetimeGranularity) -> None:
+        await self.backend.set_event_datetime_granularity(guild_id, event_id, dt_g)
+        self._bump_events(guild_id)
+
+    async def set_event_type(self, guild_id: int, event_id: str, t: Literal[0, 1, 2, 3, 4]) -> None:
+        await self.backend.set_event_type(guild_id, event_id, t)
+        self._bump_events(guild_id)
+
+    async def set_event_stashed(self, guild_id: int, event_id: str, stashed: bool) -> None:
+        await self.backend.set_event_stashed(guild_id, event_id, stashed)
+        self._bump_events(guild_id)
+
+    async def set_event_url(self, guild_id: int, event_id: str, url: str) -> None:
+        await self.backend.set_event_url(guild_id, event_id, url)
+        self._bump_events(guild_id)
+
+    async def set_event_note(self, guild_id: int, event_id: str, note: str) -> None:
+        await self.backend.set_event_note(guild_id, event_id, note)
+        self._bump_events(guild_id)
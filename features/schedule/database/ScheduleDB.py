@@ -1,34 +1,77 @@
 import datetime
-import random
-import string
-from typing import Optional, Literal, List
+import heapq
+from typing import Optional, Literal, List, Dict, Tuple, AsyncIterator
 
-import pymongo
+from pymongo import MongoClient, ReturnDocument, ReplaceOne
+from pymongo.errors import OperationFailure, DuplicateKeyError, BulkWriteError
 
 from database import MongoSingleton
-from features.schedule.models import Event, DatetimeGranularity, GuildScheduleConfig
+from features.schedule.exceptions import EventIdsExhausted
+from features.schedule.constants import JST, EXPORT_BATCH_SIZE
+from features.schedule.models import Event, DatetimeGranularity, GuildScheduleConfig, ScheduleWindow
 from .AbstractScheduleDB import AbstractScheduleDB
+from .bulk import events_by_ids, shiftable_events, shift_datetimes, reset_config_update, youtube_events, \
+    unsynced_youtube_events, set_youtube_start, event_time_updates
+from .archive import PAST_EVENTS_SORT, archive_cutoff, archivable_events, past_events
+from .history import history_pipeline
+from .export import EXPORT_SORT, all_events_pipeline, export_filter, export_key
+from .event_fields import set_event_fields
+from .event_ids import CREATE_ATTEMPTS, build_free_ids, take_free_ids, duplicate_inserts
+from .schedule_window import schedule_window_pipeline
+from .indexes import EVENT_SORT, COLLECTION_INDEXES
 
 
 class ScheduleDB(AbstractScheduleDB):
-    def __init__(self):
-        self.db = MongoSingleton.conn().client
-        self.guilds = self.db["Onigiri-Fillings"]["Guilds"]
-        self.events = self.db["Onigiri-Fillings"]["Events"]
+    def __init__(self, client: Optional[MongoClient] = None, database: str = "Onigiri-Fillings"):
+        self.db = client or MongoSingleton.conn().client
+        self.guilds = self.db[database]["Guilds"]
+        self.events = self.db[database]["Events"]
+        self.event_ids = self.db[database]["EventIds"]
+        self.archive = self.db[database]["EventsArchive"]
+
+    async def ensure_indexes(self) -> List[str]:
+        failed = []
+        for collection in [self.guilds, self.events, self.event_ids, self.archive]:
+            for index in COLLECTION_INDEXES[collection.name]:
+                try:
+                    collection.create_indexes([index])
+                except OperationFailure:
+                    failed.append(f"{collection.name}.{index.document['name']}")
+        return failed
 
     async def get_guild_exists(self, guild_id: int) -> bool:
         return bool(self.guilds.find_one({'guild_id': guild_id}))
 
     async def get_available_event_id(self, guild_id) -> str:
-        event_id = None
-        while not event_id:
-            new_id = ''.join(random.choices(string.digits, k=4))
-            if not await self.get_event_exists(guild_id, new_id):
-                event_id = new_id
-        return event_id
+        return (await self.allocate_event_ids(guild_id, 1))[0]
+
+    async def allocate_event_ids(self, guild_id: int, n: int) -> List[str]:
+        # Pop the first n IDs off the guild's pool in one atomic round trip, refilling the pool only when it is
+        # missing (first use) or too small (every ID has been handed out once)
+        enough = {"guild_id": guild_id, f"free.{n - 1}": {"$exists": True}}
+        for _ in range(2):
+            pool = self.event_ids.find_one_and_update(
+                enough, take_free_ids(n),
+                projection={"_id": False, "free": {"$slice": n}},
+                return_document=ReturnDocument.BEFORE
+            )
+            if pool:
+                return pool["free"]
+            used = self.events.distinct("event_id", {"guild_id": guild_id}) + \
+                self.archive.distinct("event_id", {"guild_id": guild_id})
+            try:
+                self.event_ids.update_one(
+                    {"guild_id": guild_id, f"free.{n - 1}": {"$exists": False}},
+                    {"$set": {"free": build_free_ids(used)}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                pass  # Another allocation refilled the pool first
+        raise EventIdsExhausted
 
     async def get_event_exists(self, guild_id, event_id: str) -> bool:
-        return bool(self.events.find_one({"$and": [{"guild_id": guild_id}, {"event_id": event_id}]}))
+        event_filter = {"$and": [{"guild_id": guild_id}, {"event_id": event_id}]}
+        return bool(self.events.find_one(event_filter) or self.archive.find_one(event_filter))
 
     async def get_guild(self, guild_id: int) -> Optional[GuildScheduleConfig]:
         guild = self.guilds.find_one({'guild_id': guild_id})
@@ -44,50 +87,108 @@ class ScheduleDB(AbstractScheduleDB):
         return [GuildScheduleConfig.from_mongo(x) for x in self.guilds.find({"enabled": True})]
 
     async def get_event(self, guild_id: int, event_id: str) -> Optional[Event]:
-        event = self.events.find_one({"$and": [{"guild_id": guild_id}, {"event_id": event_id}]})
+        event_filter = {"$and": [{"guild_id": guild_id}, {"event_id": event_id}]}
+        event = self.events.find_one(event_filter) or self.archive.find_one(event_filter)
         if event:
             return Event.from_mongo(event)
         else:
             return None
 
     async def get_all_events(self, guild_id: int) -> List[Event]:
-        return [Event.from_mongo(k) for k in self.events.find(sort=[
-            ("datetime", pymongo.DESCENDING),
-            ('datetime_granularity', pymongo.ASCENDING),
-            ('note', pymongo.DESCENDING)
-        ])]
+        return [
+            Event.from_mongo(k) for k in self.events.aggregate(all_events_pipeline(guild_id, self.archive.name))
+        ]
+
+    async def get_youtube_events(self) -> List[Event]:
+        return [Event.from_mongo(k) for k in self.events.find(youtube_events(datetime.datetime.now(JST)))]
+
+    async def iter_events(
+            self, guild_id: Optional[int] = None, event_filter: Optional[dict] = None,
+            batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Event]:
+        event_filter = export_filter(guild_id, event_filter)
+        cursors = [
+            collection.find(event_filter, sort=EXPORT_SORT, batch_size=batch_size)
+            for collection in [self.events, self.archive]
+        ]
+        for event in heapq.merge(*cursors, key=export_key):
+            yield Event.from_mongo(event)
 
     async def get_guild_events(self, guild_id: int) -> List[Event]:
         return [Event.from_mongo(k) for k in self.events.find(
             {"guild_id": guild_id},
-            sort=[
-                ("datetime", pymongo.DESCENDING),
-                ('datetime_granularity', pymongo.ASCENDING),
-                ('note', pymongo.DESCENDING)
-            ]
+            sort=EVENT_SORT
         )]
 
+    async def get_schedule_window(self, guild_id: int, past_limit: int) -> ScheduleWindow:
+        now = datetime.datetime.now(JST)
+        return ScheduleWindow.from_mongo(next(self.events.aggregate(
+            schedule_window_pipeline(guild_id, past_limit, now, self.archive.name)
+        )))
+
+    async def get_event_history(
+            self, guild_id: int, limit: int, cursor: Optional[Tuple[datetime.datetime, str]] = None,
+            newer: bool = False
+    ) -> List[Event]:
+        events = [Event.from_mongo(k) for k in self.events.aggregate(
+            history_pipeline(guild_id, limit, cursor, newer, datetime.datetime.now(JST), self.archive.name)
+        )]
+        return events[::-1] if newer else events
+
     async def create_guild(self, guild: GuildScheduleConfig) -> GuildScheduleConfig:
         self.guilds.insert_one(guild.to_dict())
         return guild
 
     async def create_event(self, event: Event) -> Event:
-        self.events.insert_one(event.to_dict())
-        return event
+        for attempt in range(CREATE_ATTEMPTS):
+            try:
+                self.events.insert_one(event.to_dict())
+                return event
+            except DuplicateKeyError:
+                if attempt == CREATE_ATTEMPTS - 1:
+                    raise
+                # The ID was handed out twice by a racing refill, take another one
+                event.event_id = (await self.allocate_event_ids(event.guild_id, 1))[0]
+
+    async def create_events(self, events: List[Event]) -> List[Event]:
+        pending = events
+        for attempt in range(CREATE_ATTEMPTS):
+            if not pending:
+                break
+            try:
+                self.events.insert_many([event.to_dict() for event in pending], ordered=False)
+                break
+            except BulkWriteError as e:
+                rejected = duplicate_inserts(e.details)
+                if rejected is None or attempt == CREATE_ATTEMPTS - 1:
+                    raise
+                # Every other event is in, only those whose ID was handed out twice are inserted again
+                pending = [pending[i] for i in rejected]
+                for guild_id in {event.guild_id for event in pending}:
+                    guild_events = [event for event in pending if event.guild_id == guild_id]
+                    event_ids = await self.allocate_event_ids(guild_id, len(guild_events))
+                    for event, event_id in zip(guild_events, event_ids):
+                        event.event_id = event_id
+        return events
 
     async def update_guild(self, guild: GuildScheduleConfig) -> GuildScheduleConfig:
         self.guilds.replace_one({"guild_id": guild.guild_id}, guild.to_dict())
         return guild
 
     async def update_event(self, event: Event) -> Event:
-        self.events.replace_one({"$and": [{"guild_id": event.guild_id, "event_id": event.event_id}]}, event.to_dict())
+        event_filter = {"$and": [{"guild_id": event.guild_id, "event_id": event.event_id}]}
+        if not self.events.replace_one(event_filter, event.to_dict()).matched_count:
+            if self._restore_event(event.guild_id, event.event_id):
+                self.events.replace_one(event_filter, event.to_dict())
         return event
 
     async def delete_guild(self, guild_id: int) -> None:
         self.guilds.delete_one({"guild_id": guild_id})
 
     async def delete_event(self, guild_id: int, event_id: str) -> None:
-        self.events.delete_one({"$and": [{"guild_id": guild_id, "event_id": event_id}]})
+        event_filter = {"$and": [{"guild_id": guild_id, "event_id": event_id}]}
+        if not self.events.delete_one(event_filter).deleted_count:
+            self.archive.delete_one(event_filter)
 
     async def set_guild_enable(self, guild_id: int) -> None:
         self.guilds.find_one_and_update({"guild_id": guild_id}, {"$set": {"enabled": True}})
@@ -119,44 +220,119 @@ class ScheduleDB(AbstractScheduleDB):
             {"$set": {"editor_role_ids": editors}}
         )
 
-    async def set_event_title(self, guild_id: int, event_id: str, title: str) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"title": title}}
+    async def set_guild_message_hashes(self, guild_id: int, hashes: Dict[str, str]) -> None:
+        self.guilds.find_one_and_update(
+            {"guild_id": guild_id},
+            {"$set": {"schedule_message_hashes": hashes}}
         )
 
+    async def update_event_fields(
+            self, guild_id: int, event_id: str, return_event: bool = False, **changes
+    ) -> Optional[Event]:
+        event = self._update_event(guild_id, event_id, set_event_fields(changes), return_event)
+        return Event.from_mongo(event) if return_event and event else None
+
+    async def set_event_title(self, guild_id: int, event_id: str, title: str) -> None:
+        await self.update_event_fields(guild_id, event_id, title=title)
+
     async def set_event_datetime(self, guild_id: int, event_id: str, dt: Optional[datetime.datetime]) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"datetime": dt}}
-        )
+        await self.update_event_fields(guild_id, event_id, datetime=dt)
 
     async def set_event_datetime_granularity(self, guild_id: int, event_id: str, dt_g: DatetimeGranularity) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"datetime_granularity": dt_g.to_dict()}}
-        )
+        await self.update_event_fields(guild_id, event_id, datetime_granularity=dt_g)
 
     async def set_event_type(self, guild_id: int, event_id: str, t: Literal[0, 1, 2, 3, 4]) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"type": t}}
-        )
+        await self.update_event_fields(guild_id, event_id, type=t)
 
     async def set_event_stashed(self, guild_id: int, event_id: str, stashed: bool) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"stashed": stashed}}
-        )
+        await self.update_event_fields(guild_id, event_id, stashed=stashed)
 
     async def set_event_url(self, guild_id: int, event_id: str, url: str) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"url": url}}
-        )
+        await self.update_event_fields(guild_id, event_id, url=url)
 
     async def set_event_note(self, guild_id: int, event_id: str, note: str) -> None:
-        self.events.find_one_and_update(
-            {'$and': [{"guild_id": guild_id, "event_id": event_id}]},
-            {"$set": {"note": note}}
+        await self.update_event_fields(guild_id, event_id, note=note)
+
+    # ====
+    # Bulk
+    # ====
+    async def set_events_stashed(self, guild_id: int, event_ids: List[str], stashed: bool) -> int:
+        # Stashing never changes when an event happens, so archived events are updated in place
+        event_filter = events_by_ids(guild_id, event_ids)
+        update = {"$set": {"stashed": stashed}}
+        return self.events.update_many(event_filter, update).matched_count + \
+            self.archive.update_many(event_filter, update).matched_count
+
+    async def delete_events(self, guild_id: int, event_ids: List[str]) -> int:
+        event_filter = events_by_ids(guild_id, event_ids)
+        return self.events.delete_many(event_filter).deleted_count + \
+            self.archive.delete_many(event_filter).deleted_count
+
+    async def delete_guild_events(self, guild_id: int) -> int:
+        deleted = self.events.delete_many({"guild_id": guild_id}).deleted_count + \
+            self.archive.delete_many({"guild_id": guild_id}).deleted_count
+        # The pool is rebuilt from scratch on the next allocation
+        self.event_ids.delete_one({"guild_id": guild_id})
+        return deleted
+
+    async def reset_guild_config(self, guild_id: int) -> None:
+        self.guilds.update_one({"guild_id": guild_id}, reset_config_update())
+
+    async def shift_future_events(self, guild_id: int, delta: datetime.timedelta) -> int:
+        whole_days = not delta % datetime.timedelta(days=1)
+        event_filter = shiftable_events(guild_id, datetime.datetime.now(JST), whole_days)
+        return self.events.update_many(event_filter, shift_datetimes(delta)).modified_count
+
+    async def update_event_times(self, events: List[Event]) -> int:
+        if not events:
+            return 0
+        return self.events.bulk_write(event_time_updates(events), ordered=False).modified_count
+
+    async def backfill_youtube_starts(self) -> int:
+        return self.events.update_many(
+            unsynced_youtube_events(datetime.datetime.now(JST)), set_youtube_start()
+        ).modified_count
+
+    # =======
+    # Archive
+    # =======
+    def _restore_event(self, guild_id: int, event_id: str) -> bool:
+        # Archived events move back to Events before they are written, the next archive run re-archives them if
+        # they are still old. Insert before delete, so a failure in between never loses the event.
+        event_filter = {"$and": [{"guild_id": guild_id, "event_id": event_id}]}
+        event = self.archive.find_one(event_filter)
+        if not event:
+            return False
+        try:
+            self.events.insert_one(event)
+        except DuplicateKeyError:
+            pass  # Restored by a concurrent write
+        self.archive.delete_one(event_filter)
+        return True
+
+    def _update_event(
+            self, guild_id: int, event_id: str, update: dict, return_event: bool = False
+    ) -> Optional[dict]:
+        event_filter = {"$and": [{"guild_id": guild_id, "event_id": event_id}]}
+        # Without return_event, only the _id comes back, the round trip is as cheap as an update_one
+        kwargs = {"projection": None if return_event else {"_id": True}, "return_document": ReturnDocument.AFTER}
+        event = self.events.find_one_and_update(event_filter, update, **kwargs)
+        if not event and self._restore_event(guild_id, event_id):
+            event = self.events.find_one_and_update(event_filter, update, **kwargs)
+        return event
+
+    async def archive_events(self, guild_id: int, older_than: datetime.datetime, keep: int, batch_size: int) -> int:
+        # The most recent `keep` past events stay, whatever their age
+        edge = self.events.find_one(
+            past_events(guild_id), {"datetime": True}, sort=PAST_EVENTS_SORT, skip=keep - 1
         )
+        cutoff = archive_cutoff(older_than, edge)
+        if not cutoff:
+            return 0
+        moved = 0
+        while batch := list(self.events.find(archivable_events(guild_id, cutoff)).limit(batch_size)):
+            # Upserts make a retry after a failure between the two writes harmless
+            self.archive.bulk_write([ReplaceOne({"_id": k["_id"]}, k, upsert=True) for k in batch], ordered=False)
+            self.events.delete_many({"_id": {"$in": [k["_id"] for k in batch]}})
+            moved += len(batch)
+        return moved
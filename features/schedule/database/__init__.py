@@ -1 +1,5 @@
+from features.schedule.database.AbstractScheduleDB import AbstractScheduleDB
+from features.schedule.database.CachedScheduleDB import CachedScheduleDB
+from features.schedule.database.MotorScheduleDB import MotorScheduleDB
 from features.schedule.database.ScheduleDB import ScheduleDB
+from features.schedule.database.provider import get_schedule_db
@@ -0,0 +1,46 @@
+import datetime
+from typing import Optional
+
+from pymongo import DESCENDING
+
+from features.schedule.constants import JST
+from features.schedule.models.Event import utc_as_jst
+
+__all__ = ["PAST_EVENTS_SORT", "past_events", "archive_cutoff", "archivable_events"]
+
+# Most recent past event first
+PAST_EVENTS_SORT = [("datetime", DESCENDING)]
+
+
+def past_events(guild_id: int) -> dict:
+    """
+    Builds the filter matching a guild's events that already happened.
+
+    :param guild_id: The ID of the guild.
+    :return: dict
+    """
+    return {"guild_id": guild_id, "datetime": {"$ne": None, "$lte": datetime.datetime.now(JST)}}
+
+
+def archive_cutoff(older_than: datetime.datetime, edge: Optional[dict]) -> Optional[datetime.datetime]:
+    """
+    Gets the moment before which a guild's events can be archived.
+
+    :param older_than: Events older than this are archived.
+    :param edge: The oldest past event the schedule still shows, None if the guild has no past events beyond it.
+    :return: Optional[datetime.datetime], None if nothing can be archived.
+    """
+    if not edge:
+        return None
+    return min(older_than, utc_as_jst(edge["datetime"]))
+
+
+def archivable_events(guild_id: int, cutoff: datetime.datetime) -> dict:
+    """
+    Builds the filter matching the events of a guild to move to the archive.
+
+    :param guild_id: The ID of the guild.
+    :param cutoff: From archive_cutoff().
+    :return: dict
+    """
+    return {"guild_id": guild_id, "datetime": {"$ne": None, "$lt": cutoff}}
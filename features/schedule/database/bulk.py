@@ -0,0 +1,123 @@
+import datetime
+from typing import List
+
+from pymongo import UpdateOne
+
+from features.schedule.models import GuildScheduleConfig, Event
+
+__all__ = ["events_by_ids", "shiftable_events", "shift_datetimes", "reset_config_update", "youtube_events",
+           "unsynced_youtube_events", "set_youtube_start", "event_time_updates"]
+
+# Time of day, in UTC, that parse_date gives events without a time (23:59:59 JST)
+UNTIMED = "14:59:59"
+
+
+def events_by_ids(guild_id: int, event_ids: list) -> dict:
+    """
+    Builds the filter matching a set of a guild's events.
+
+    :param guild_id: The ID of the guild.
+    :param event_ids: The IDs of the events.
+    :return: dict
+    """
+    return {"guild_id": guild_id, "event_id": {"$in": list(event_ids)}}
+
+
+def shiftable_events(guild_id: int, now: datetime.datetime, whole_days: bool) -> dict:
+    """
+    Builds the filter matching the future events of a guild that a shift moves. Only events with a day move, and
+    events without a time only move by whole days, so they keep rendering as dates.
+
+    :param guild_id: The ID of the guild.
+    :param now: The moment separating past from future events.
+    :param whole_days: Whether the shift is a whole number of days.
+    :return: dict
+    """
+    event_filter = {"guild_id": guild_id, "datetime": {"$gt": now}, "datetime_granularity.day": True}
+    if not whole_days:
+        event_filter["$expr"] = {
+            "$ne": [{"$dateToString": {"date": "$datetime", "format": "%H:%M:%S"}}, UNTIMED]
+        }
+    return event_filter
+
+
+def shift_datetimes(delta: datetime.timedelta) -> list:
+    """
+    Builds the update pipeline that moves the datetime of every matched event by `delta`, on the server.
+
+    :param delta: How far to move the events, negative to move them earlier.
+    :return: list
+    """
+    return [{"$set": {"datetime": {"$add": ["$datetime", int(delta.total_seconds() * 1000)]}}}]
+
+
+def youtube_events(now: datetime.datetime) -> dict:
+    """
+    Builds the filter matching the future events of every guild that link to YouTube and took their time from the
+    scheduled start of the video.
+
+    :param now: The moment separating past from future events.
+    :return: dict
+    """
+    return {
+        "datetime": {"$gt": now},
+        "youtube_start": {"$ne": None},
+        "url": {"$regex": r"youtu\.?be", "$options": "i"},
+    }
+
+
+def unsynced_youtube_events(now: datetime.datetime) -> dict:
+    """
+    Builds the filter matching the future, timed events of every guild that link to YouTube but were created before
+    events kept the scheduled start of their video. Events whose youtube_start was cleared on purpose still have the
+    field, so they are left alone.
+
+    :param now: The moment separating past from future events.
+    :return: dict
+    """
+    return {
+        "datetime": {"$gt": now},
+        "datetime_granularity.day": True,
+        "youtube_start": {"$exists": False},
+        "url": {"$regex": r"youtu\.?be", "$options": "i"},
+        "$expr": {"$ne": [{"$dateToString": {"date": "$datetime", "format": "%H:%M:%S"}}, UNTIMED]},
+    }
+
+
+def set_youtube_start() -> list:
+    """
+    Builds the update pipeline that takes the current datetime of every matched event as the start of its video.
+
+    :return: list
+    """
+    return [{"$set": {"youtube_start": "$datetime"}}]
+
+
+def event_time_updates(events: List[Event]) -> List[UpdateOne]:
+    """
+    Builds the bulk write setting the datetime, video start and type of events to the ones they hold.
+
+    :param events: The updated events.
+    :return: List[UpdateOne]
+    """
+    return [
+        UpdateOne(
+            {"guild_id": event.guild_id, "event_id": event.event_id},
+            {"$set": {"datetime": event.datetime, "youtube_start": event.youtube_start, "type": event.type}}
+        )
+        for event in events
+    ]
+
+
+def reset_config_update() -> dict:
+    """
+    Builds the update that puts a guild's configs back to the defaults of a newly set up guild. The schedule
+    channel and messages are kept, so the schedule keeps working.
+
+    :return: dict
+    """
+    defaults = GuildScheduleConfig(guild_id=0, schedule_channel_id=0, schedule_message_id_array=[],
+                                   editor_role_id_array=[]).to_dict()
+    for kept in ["guild_id", "schedule_channel_id", "schedule_message_ids"]:
+        del defaults[kept]
+    return {"$set": defaults}
@@ -0,0 +1,25 @@
+from dataclasses import fields
+
+from features.schedule.models import DatetimeGranularity, Event
+
+__all__ = ["EVENT_FIELDS", "set_event_fields"]
+
+# The fields of an event that can be changed after it is created
+EVENT_FIELDS = frozenset(field.name for field in fields(Event)) - {"guild_id", "event_id"}
+
+
+def set_event_fields(changes: dict) -> dict:
+    """
+    Builds the update that applies any combination of field changes to an event in a single `$set`.
+
+    :param changes: New values keyed by Event field name.
+    :return: dict
+    """
+    if not changes:
+        raise ValueError("No event fields to update.")
+    if unknown := set(changes) - EVENT_FIELDS:
+        raise ValueError(f"Unknown event field(s): {', '.join(sorted(unknown))}.")
+    return {"$set": {
+        name: value.to_dict() if isinstance(value, DatetimeGranularity) else value
+        for name, value in changes.items()
+    }}
@@ -0,0 +1,50 @@
+import random
+from typing import Iterable, List, Optional
+
+__all__ = ["EVENT_ID_SPACE", "CREATE_ATTEMPTS", "build_free_ids", "take_free_ids", "duplicate_inserts"]
+
+# Every 4-digit event ID a guild can hand out
+EVENT_ID_SPACE = [f"{i:04}" for i in range(10000)]
+# Inserts of an event before giving up on finding it a free ID
+CREATE_ATTEMPTS = 3
+# Server error code of a write that breaks a unique index
+DUPLICATE_KEY = 11000
+
+
+def build_free_ids(used: Iterable[str]) -> List[str]:
+    """
+    Builds a guild's pool of free event IDs, shuffled so consecutive events do not get consecutive IDs.
+
+    :param used: The event IDs the guild already uses.
+    :return: List[str]
+    """
+    used = set(used)
+    free = [event_id for event_id in EVENT_ID_SPACE if event_id not in used]
+    random.shuffle(free)
+    return free
+
+
+def take_free_ids(n: int) -> list:
+    """
+    Builds the update pipeline that drops the first `n` IDs of a pool. Paired with a `{"free": {"$slice": n}}`
+    projection on the document before the update, it hands out those IDs in one atomic round trip.
+
+    :param n: The number of IDs to take.
+    :return: list
+    """
+    return [{"$set": {"free": {"$slice": ["$free", n, {"$max": [1, {"$size": "$free"}]}]}}}]
+
+
+def duplicate_inserts(details: dict) -> Optional[List[int]]:
+    """
+    Gets the documents an unordered insert_many rejected because their event ID is already in use. A refill of the
+    pool can race an allocation whose event is not inserted yet and hand its ID out again, these events need a new
+    one.
+
+    :param details: The details of the BulkWriteError.
+    :return: Optional[List[int]], the indexes of the rejected documents, None if any write failed for another reason.
+    """
+    errors = details.get("writeErrors", [])
+    if details.get("writeConcernErrors") or any(error["code"] != DUPLICATE_KEY for error in errors):
+        return None
+    return [error["index"] for error in errors]
@@ -0,0 +1,72 @@
+import heapq
+from typing import Optional, AsyncIterator, Tuple
+
+from pymongo import ASCENDING
+
+from .indexes import EVENT_SORT
+
+__all__ = ["EXPORT_SORT", "all_events_pipeline", "export_filter", "export_key", "merge_sorted"]
+
+# Guild by guild, served by the guild_id_event_id index of both event collections
+EXPORT_SORT = [("guild_id", ASCENDING), ("event_id", ASCENDING)]
+
+
+def all_events_pipeline(guild_id: int, archive: str) -> list:
+    """
+    Builds the aggregation that reads all of a guild's events, archived ones included, in EVENT_SORT order.
+
+    :param guild_id: The ID of the guild.
+    :param archive: The name of the archive collection.
+    :return: list
+    """
+    return [
+        {"$match": {"guild_id": guild_id}},
+        {"$unionWith": {"coll": archive, "pipeline": [{"$match": {"guild_id": guild_id}}]}},
+        {"$sort": dict(EVENT_SORT)},
+    ]
+
+
+def export_filter(guild_id: Optional[int], event_filter: Optional[dict]) -> dict:
+    """
+    Builds the filter of an event export.
+
+    :param guild_id: The ID of the guild to export, None for all guilds.
+    :param event_filter: An additional MongoDB filter on the events, None to export them all.
+    :return: dict
+    """
+    filters = ([{"guild_id": guild_id}] if guild_id is not None else []) + ([event_filter] if event_filter else [])
+    if len(filters) > 1:
+        return {"$and": filters}
+    return filters[0] if filters else {}
+
+
+def export_key(event: dict) -> Tuple[int, str]:
+    """
+    Gets the position of an event document in EXPORT_SORT order.
+
+    :param event: The event document.
+    :return: Tuple[int, str]
+    """
+    return event["guild_id"], event["event_id"]
+
+
+async def merge_sorted(*cursors: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """
+    Merges cursors that are each sorted by EXPORT_SORT into one sorted stream. Only one document per cursor is held
+    at a time, on top of the cursors' own batches.
+
+    :param cursors: The cursors to merge.
+    :return: AsyncIterator[dict]
+    """
+    heads = []
+    for i, cursor in enumerate(cursors):
+        if (event := await anext(cursor, None)) is not None:
+            heads.append((export_key(event), i, event))
+    heapq.heapify(heads)
+    while heads:
+        _, i, event = heads[0]
+        yield event
+        if (event := await anext(cursors[i], None)) is not None:
+            heapq.heapreplace(heads, (export_key(event), i, event))
+        else:
+            heapq.heappop(heads)
@@ -0,0 +1,57 @@
+import datetime
+from typing import Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+__all__ = ["history_filter", "history_pipeline"]
+
+
+def history_filter(
+        guild_id: int, cursor: Optional[Tuple[datetime.datetime, str]], newer: bool, now: datetime.datetime
+) -> dict:
+    """
+    Builds the filter matching a guild's past events on one side of a history cursor. The datetime bounds start at
+    the cursor, so the index scan of a deep page starts where the page does.
+
+    :param guild_id: The ID of the guild.
+    :param cursor: The (datetime, event_id) of the event the page starts after, None for the most recent page.
+    :param newer: Whether to match the events newer than the cursor instead of older ones.
+    :param now: The moment separating past from future events.
+    :return: dict
+    """
+    if not cursor:
+        return {"guild_id": guild_id, "datetime": {"$ne": None, "$lte": now}}
+    cursor_datetime, cursor_event_id = cursor
+    if newer:
+        datetime_range = {"$gte": cursor_datetime, "$lte": now}
+    else:
+        datetime_range = {"$ne": None, "$lte": min(cursor_datetime, now)}
+    op = "$gt" if newer else "$lt"
+    return {"$and": [{"guild_id": guild_id, "datetime": datetime_range}, {"$or": [
+        {"datetime": {op: cursor_datetime}},
+        {"datetime": cursor_datetime, "event_id": {op: cursor_event_id}},
+    ]}]}
+
+
+def history_pipeline(
+        guild_id: int, limit: int, cursor: Optional[Tuple[datetime.datetime, str]], newer: bool,
+        now: datetime.datetime, archive: str
+) -> list:
+    """
+    Builds the aggregation that reads one page of a guild's past events from Events and the archive. Pages are
+    keyed on (datetime, event_id), so each page is a bounded index range scan no matter how deep it is.
+
+    :param guild_id: The ID of the guild.
+    :param limit: The number of events to read.
+    :param cursor: The (datetime, event_id) of the event the page starts after, None for the most recent page.
+    :param newer: Whether to read the events newer than the cursor instead of older ones. They come out oldest first.
+    :param now: The moment separating past from future events.
+    :param archive: The name of the archive collection.
+    :return: list
+    """
+    event_filter = history_filter(guild_id, cursor, newer, now)
+    order = ASCENDING if newer else DESCENDING
+    sort = {"$sort": {"datetime": order, "event_id": order}}
+    # Each collection is cut to one page before the two are merged
+    page = [{"$match": event_filter}, sort, {"$limit": limit}]
+    return page + [{"$unionWith": {"coll": archive, "pipeline": page}}, sort, {"$limit": limit}]
@@ -0,0 +1,114 @@
+import datetime
+from typing import NamedTuple, Optional, List, Tuple
+
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+from .bulk import youtube_events, unsynced_youtube_events
+from .history import history_filter
+
+__all__ = ["GUILD_INDEXES", "EVENT_INDEXES", "EVENT_ID_POOL_INDEXES", "COLLECTION_INDEXES", "EVENT_SORT",
+           "QUERY_SHAPES", "QueryShape"]
+
+# The order schedule events are read in
+EVENT_SORT = [
+    ("datetime", DESCENDING),
+    ('datetime_granularity', ASCENDING),
+    ('note', DESCENDING)
+]
+
+GUILD_INDEXES = [
+    IndexModel([("guild_id", ASCENDING)], name="guild_id", unique=True),
+    IndexModel([("enabled", ASCENDING)], name="enabled"),
+]
+
+EVENT_INDEXES = [
+    IndexModel([("guild_id", ASCENDING), ("event_id", ASCENDING)], name="guild_id_event_id", unique=True),
+    IndexModel([("guild_id", ASCENDING)] + EVENT_SORT, name="guild_id_schedule_order"),
+    IndexModel(
+        [("guild_id", ASCENDING), ("datetime", DESCENDING), ("event_id", DESCENDING)], name="guild_id_history_order"
+    ),
+    # Cross-guild reads of future events, such as the YouTube sync
+    IndexModel([("datetime", ASCENDING)], name="datetime"),
+]
+
+EVENT_ID_POOL_INDEXES = [
+    IndexModel([("guild_id", ASCENDING)], name="guild_id", unique=True),
+]
+
+COLLECTION_INDEXES = {
+    "Guilds": GUILD_INDEXES,
+    "Events": EVENT_INDEXES,
+    "EventIds": EVENT_ID_POOL_INDEXES,
+    # Archived events are looked up the same way as live ones
+    "EventsArchive": EVENT_INDEXES,
+}
+
+
+class QueryShape(NamedTuple):
+    name: str
+    collection: str
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+    allow_collscan: bool = False
+
+
+# Every query shape ScheduleDB issues. Updates and deletes use the same filters as the matching reads.
+QUERY_SHAPES = [
+    QueryShape("guild by id", "Guilds", {"guild_id": 0}),
+    QueryShape("enabled guilds", "Guilds", {"enabled": True}),
+    # get_all_guilds reads every config on purpose
+    QueryShape("all guilds", "Guilds", {}, allow_collscan=True),
+    QueryShape("event by id", "Events", {"$and": [{"guild_id": 0}, {"event_id": "0000"}]}),
+    QueryShape("guild events", "Events", {"guild_id": 0}, EVENT_SORT),
+    QueryShape(
+        "past events", "Events", {"guild_id": 0, "datetime": {"$ne": None, "$lte": datetime.datetime(2000, 1, 1)}},
+        [("datetime", DESCENDING)]
+    ),
+    QueryShape(
+        "archivable events", "Events", {"guild_id": 0, "datetime": {"$ne": None, "$lt": datetime.datetime(2000, 1, 1)}}
+    ),
+    QueryShape("archived event by id", "EventsArchive", {"$and": [{"guild_id": 0}, {"event_id": "0000"}]}),
+    QueryShape("events by ids", "Events", {"guild_id": 0, "event_id": {"$in": ["0000", "0001"]}}),
+    QueryShape("archived events by ids", "EventsArchive", {"guild_id": 0, "event_id": {"$in": ["0000", "0001"]}}),
+    QueryShape(
+        "shiftable events", "Events",
+        {"guild_id": 0, "datetime": {"$gt": datetime.datetime(2000, 1, 1)}, "datetime_granularity.day": True}
+    ),
+    QueryShape(
+        "history page", "Events",
+        {"guild_id": 0, "datetime": {"$ne": None, "$lte": datetime.datetime(2000, 1, 1)}},
+        [("datetime", DESCENDING), ("event_id", DESCENDING)]
+    ),
+    QueryShape(
+        "archived history page", "EventsArchive",
+        {"guild_id": 0, "datetime": {"$ne": None, "$lte": datetime.datetime(2000, 1, 1)}},
+        [("datetime", DESCENDING), ("event_id", DESCENDING)]
+    ),
+    QueryShape(
+        "history page after cursor", "Events",
+        history_filter(0, (datetime.datetime(1999, 1, 1), "0000"), False, datetime.datetime(2000, 1, 1)),
+        [("datetime", DESCENDING), ("event_id", DESCENDING)]
+    ),
+    QueryShape(
+        "archived history page after cursor", "EventsArchive",
+        history_filter(0, (datetime.datetime(1999, 1, 1), "0000"), False, datetime.datetime(2000, 1, 1)),
+        [("datetime", DESCENDING), ("event_id", DESCENDING)]
+    ),
+    QueryShape(
+        "newer history page after cursor", "Events",
+        history_filter(0, (datetime.datetime(1999, 1, 1), "0000"), True, datetime.datetime(2000, 1, 1)),
+        [("datetime", ASCENDING), ("event_id", ASCENDING)]
+    ),
+    QueryShape(
+        "archived newer history page after cursor", "EventsArchive",
+        history_filter(0, (datetime.datetime(1999, 1, 1), "0000"), True, datetime.datetime(2000, 1, 1)),
+        [("datetime", ASCENDING), ("event_id", ASCENDING)]
+    ),
+    QueryShape("future YouTube events", "Events", youtube_events(datetime.datetime(2000, 1, 1))),
+    QueryShape("YouTube events to backfill", "Events", unsynced_youtube_events(datetime.datetime(2000, 1, 1))),
+    QueryShape("archived guild events", "EventsArchive", {"guild_id": 0}),
+    QueryShape("event id pool", "EventIds", {"guild_id": 0, "free.0": {"$exists": True}}),
+    # iter_events walks whole collections on purpose, but in index order
+    QueryShape("event export", "Events", {}, [("guild_id", ASCENDING), ("event_id", ASCENDING)]),
+    QueryShape("archived event export", "EventsArchive", {}, [("guild_id", ASCENDING), ("event_id", ASCENDING)]),
+]
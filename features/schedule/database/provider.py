@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from .AbstractScheduleDB import AbstractScheduleDB
+from .CachedScheduleDB import CachedScheduleDB
+from .MotorScheduleDB import MotorScheduleDB
+from .ScheduleDB import ScheduleDB
+
+load_dotenv()
+
+BACKENDS = ["pymongo", "motor"]
+
+_instance: Optional[CachedScheduleDB] = None
+
+
+def get_schedule_db() -> CachedScheduleDB:
+    """
+    Returns the schedule database shared by the whole bot. The backend is picked once, on first use, from the
+    `SCHEDULE_DB_BACKEND` environment variable ("pymongo" or "motor", defaults to "pymongo"), and is wrapped in a
+    CachedScheduleDB.
+
+    :return: CachedScheduleDB
+    """
+    global _instance
+    if _instance is None:
+        backend_db: AbstractScheduleDB
+        backend = os.getenv("SCHEDULE_DB_BACKEND", "pymongo").lower()
+        if backend == "motor":
+            backend_db = MotorScheduleDB()
+        elif backend == "pymongo":
+            backend_db = ScheduleDB()
+        else:
+            raise ValueError(f"Unknown schedule DB backend \"{backend}\". Expected one of: {', '.join(BACKENDS)}.")
+        _instance = CachedScheduleDB(backend_db)
+    return _instance
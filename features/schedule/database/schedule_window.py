@@ -0,0 +1,53 @@
+import datetime
+
+from pymongo import ASCENDING, DESCENDING
+
+from .indexes import EVENT_SORT
+
+__all__ = ["schedule_window_pipeline"]
+
+
+def schedule_window_pipeline(guild_id: int, past_limit: int, now: datetime.datetime, archive: str) -> list:
+    """
+    Builds the aggregation that reads a guild's ScheduleWindow in one round trip. Its single result document is
+    read with ScheduleWindow.from_mongo().
+
+    Ties between events at the same time are ordered as in EVENT_SORT, so the window renders exactly like the
+    guild's full event list would.
+
+    :param guild_id: The ID of the guild.
+    :param past_limit: The number of most recent past events to return.
+    :param now: The moment separating past from future events.
+    :param archive: The name of the archive collection, whose events count towards past_total.
+    :return: list
+    """
+    past = {"datetime": {"$ne": None, "$lte": now}}
+    return [
+        {"$match": {"guild_id": guild_id}},
+        {"$facet": {
+            # Newest first so $limit keeps the most recent ones, ScheduleWindow reverses them
+            "past": [
+                {"$match": past},
+                {"$sort": {"datetime": DESCENDING, "datetime_granularity": DESCENDING, "note": ASCENDING}},
+                {"$limit": past_limit},
+            ],
+            "future": [
+                {"$match": {"datetime": {"$gt": now}}},
+                {"$sort": {"datetime": ASCENDING, "datetime_granularity": ASCENDING, "note": DESCENDING}},
+            ],
+            "undated": [
+                {"$match": {"datetime": None}},
+                {"$sort": dict(EVENT_SORT)},
+            ],
+            # Archived events are all past events, the guild_id index alone is enough to count them
+            "past_total": [
+                {"$match": past},
+                {"$project": {"_id": False, "guild_id": True}},
+                {"$unionWith": {"coll": archive, "pipeline": [
+                    {"$match": {"guild_id": guild_id}},
+                    {"$project": {"_id": False, "guild_id": True}},
+                ]}},
+                {"$count": "count"},
+            ],
+        }},
+    ]
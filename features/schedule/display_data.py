@@ -19,6 +19,12 @@ class Descriptions:
 
         self.note = "A note displayed under an event."
 
+        self.event_ids = "The 4 digit numerical IDs of the events, separated by spaces or commas."
+
+        self.shift_amount = "How far to move the events. Negative to move them earlier."
+
+        self.shift_unit = "Whether the amount is in hours or days. Events without a time only move by whole days."
+
         self.date = "The date of the event in JST. (Example: Jul 12, 22/7/12, 7/12, 12 Jul 2022, " \
                     "October, 2023, today, tomorrow, etc.)"
 
@@ -32,12 +38,16 @@ class Descriptions:
 
         self.editor_role = "Users with this role can edit the schedule."
 
+        self.import_file = "A CSV file with the columns title, date, time, type, note, url, or a JSON list of events."
+
         self.cmd_setup = dp + "Sets the schedule channel and creates a new set of schedule messages."
 
         self.cmd_add = dp + "Adds an event to the schedule."
 
         self.cmd_add_yt = dp + "Adds an event to the schedule from a YouTube URL."
 
+        self.cmd_import = dp + "Adds many events at once from a CSV or JSON file, or from text if no file is given."
+
         self.cmd_refresh = dp + "Manually refreshes the schedule."
 
         self.cmd_config = dp + "A set of commands to adjust the configurations for this server."
@@ -83,6 +93,16 @@ class Descriptions:
 
         self.cmd_type = dp + "Sets the type of an event. Leave out to remove."
 
+        self.cmd_bulk = dp + "A set of commands that change many events at once."
+
+        self.cmd_bulk_stash = dp + "Stashes many events at once."
+
+        self.cmd_bulk_unstash = dp + "Unstashes many events at once."
+
+        self.cmd_bulk_delete = dp + "Deletes many events at once."
+
+        self.cmd_bulk_shift = dp + "Moves all future events by a number of hours or days."
+
         self.cmd_history = dp + "Shows the history of schedule events on this server."
 
 
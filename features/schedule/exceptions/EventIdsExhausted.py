@@ -0,0 +1,8 @@
+from discord.app_commands import AppCommandError
+
+
+class EventIdsExhausted(AppCommandError):
+    def __init__(self):
+        self.message = "There are no event IDs left on this server. Delete some events with:" \
+                       "\n\n >  /schedule delete\n\nfirst."
+        super().__init__(self.message)
@@ -1,3 +1,4 @@
+from features.schedule.exceptions.EventIdsExhausted import EventIdsExhausted
 from features.schedule.exceptions.GuildNotEnabled import GuildNotEnabled
 from features.schedule.exceptions.GuildNotRegistered import GuildNotRegistered
 from features.schedule.exceptions.MessageUnreachable import MessageUnreachable
@@ -21,6 +21,7 @@ class Event:
     stashed: bool = False
     url: str = ""
     note: str = ""
+    youtube_start: Optional[datetime.datetime] = None
 
     @classmethod
     def from_dict(cls: Type[T], d: dict) -> T:
@@ -33,13 +34,15 @@ class Event:
             type=d.get("type", 0),
             stashed=d.get("stashed", False),
             url=d.get("url", ""),
-            note=d.get("note", "")
+            note=d.get("note", ""),
+            youtube_start=d.get("youtube_start")
         )
 
     @classmethod
     def from_mongo(cls: Type[T], d: dict) -> T:
         event = cls.from_dict(d)
         event.datetime = utc_as_jst(event.datetime)
+        event.youtube_start = utc_as_jst(event.youtube_start)
         return event
 
     def to_dict(self) -> dict:
@@ -52,7 +55,8 @@ class Event:
             "type": self.type,
             "stashed": self.stashed,
             "url": self.url,
-            "note": self.note
+            "note": self.note,
+            "youtube_start": self.youtube_start
         }
 
 
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Type, TypeVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Type, TypeVar
 
 T = TypeVar("T")
 
@@ -13,6 +13,8 @@ class GuildScheduleConfig:
     enabled: bool = True
     talent: str = ""
     description: str = ""
+    # Hash of the content last pushed to each schedule message, keyed by the message ID as a string
+    schedule_message_hashes: Dict[str, str] = field(default_factory=dict)
 
     @classmethod
     def from_dict(cls: Type[T], d: dict) -> T:
@@ -32,7 +34,8 @@ class GuildScheduleConfig:
             editor_role_id_array=editor_role_id_array,
             enabled=d.get("enabled", True),
             talent=d.get("talent", ""),
-            description=d.get("description", "")
+            description=d.get("description", ""),
+            schedule_message_hashes=d.get("schedule_message_hashes", {})
         )
 
     @classmethod
@@ -47,5 +50,6 @@ class GuildScheduleConfig:
             "editor_role_ids": self.editor_role_id_array,
             "enabled": self.enabled,
             "talent": self.talent,
-            "description": self.description
+            "description": self.description,
+            "schedule_message_hashes": self.schedule_message_hashes
         }
@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+from typing import List, Type, TypeVar
+
+from features.schedule.models import Event
+
+T = TypeVar("T")
+
+
+@dataclass
+class ScheduleWindow:
+    """
+    The part of a guild's events the rendered schedule shows.
+
+    `past` holds the most recent past events, oldest first. `upcoming` holds every future event, soonest first,
+    followed by the events without a date. `past_total` counts all past events, including the ones left out and the
+    archived ones.
+    """
+    past: List[Event] = field(default_factory=list)
+    upcoming: List[Event] = field(default_factory=list)
+    past_total: int = 0
+
+    @property
+    def events(self) -> List[Event]:
+        return self.past + self.upcoming
+
+    @classmethod
+    def from_mongo(cls: Type[T], d: dict) -> T:
+        return cls(
+            past=[Event.from_mongo(k) for k in reversed(d["past"])],
+            upcoming=[Event.from_mongo(k) for k in d["future"] + d["undated"]],
+            past_total=d["past_total"][0]["count"] if d["past_total"] else 0
+        )
@@ -1,3 +1,4 @@
 from features.schedule.models.DatetimeGranularity import DatetimeGranularity
 from features.schedule.models.Event import Event
 from features.schedule.models.GuildScheduleConfig import GuildScheduleConfig
+from features.schedule.models.ScheduleWindow import ScheduleWindow
@@ -0,0 +1,86 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+
+class RefreshCoordinator:
+    """
+    Funnels every refresh of a guild through one place. Requests for a guild that arrive within `delay` seconds of
+    each other share a single refresh, and at most one refresh per guild is in flight at any time. A request made
+    while a refresh is running is served by the next one, so it always sees the data written before it was made.
+    """
+
+    def __init__(self, refresh: Callable[[int, bool], Awaitable[Any]], delay: float):
+        """
+        :param refresh: Called with the guild ID and whether to force the refresh.
+        :param delay: Seconds to wait for more requests before refreshing.
+        """
+        self._refresh = refresh
+        self.delay = delay
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._force: Set[int] = set()
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._tasks: Set[asyncio.Task] = set()
+        self.requested = 0
+        self.refreshed = 0
+
+    def request(self, guild_id: int, force: bool = False, delay: Optional[float] = None) -> asyncio.Future:
+        """
+        Requests a refresh of a guild.
+
+        :param guild_id: The ID of the guild.
+        :param force: Whether the refresh should be forced. Any forced request forces the shared refresh.
+        :param delay: Overrides the coalescing window for a newly scheduled refresh.
+        :return: A future resolving to the result of the refresh that covers this request.
+        """
+        self.requested += 1
+        if force:
+            self._force.add(guild_id)
+        if future := self._pending.get(guild_id):
+            return future
+        future = asyncio.get_running_loop().create_future()
+        # Nobody might await the result, don't let an unretrieved exception warn at shutdown
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[guild_id] = future
+        task = asyncio.create_task(self._run(guild_id, future, self.delay if delay is None else delay))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return future
+
+    def cancel(self) -> None:
+        """
+        Cancels every pending and running refresh. Waiting requests are cancelled with them.
+
+        :return: None
+        """
+        for task in self._tasks:
+            task.cancel()
+
+    async def _run(self, guild_id: int, future: asyncio.Future, delay: float) -> None:
+        try:
+            await self._run_once(guild_id, future, delay)
+        except asyncio.CancelledError:
+            if self._pending.get(guild_id) is future:
+                del self._pending[guild_id]
+            future.cancel()
+            raise
+
+    async def _run_once(self, guild_id: int, future: asyncio.Future, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        async with self._locks[guild_id]:
+            # From here on, new requests wait for the next refresh
+            self._pending.pop(guild_id, None)
+            force = guild_id in self._force
+            self._force.discard(guild_id)
+            self.refreshed += 1
+            try:
+                result = await self._refresh(guild_id, force)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+        if not self._locks[guild_id].locked() and guild_id not in self._pending:
+            del self._locks[guild_id]
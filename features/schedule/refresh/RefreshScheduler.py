@@ -0,0 +1,89 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class RefreshScheduler:
+    """
+    Refreshes each guild at its next render-changing moment. Deadlines live in a min-heap, and a single task sleeps
+    until the earliest one. Rescheduling a guild just pushes a new entry, older entries of that guild are skipped
+    when they reach the top of the heap.
+    """
+
+    def __init__(self, refresh: Callable[[int], Awaitable[Any]], concurrency: int, grace: float = 1.0):
+        """
+        :param refresh: Called with the guild ID once the guild's deadline has passed.
+        :param concurrency: Maximum number of guilds refreshed at once, many guilds share the JST midnight boundary.
+        :param grace: Seconds to wait past a deadline, so the boundary is behind us when the guild is rendered.
+        """
+        self.logger = logging.getLogger("Onigiri.schedule.scheduler")
+        self._refresh = refresh
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._grace = grace
+        self._heap: List[Tuple[float, int]] = []
+        self._deadlines: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, guild_id: int, when: Optional[datetime]) -> None:
+        """
+        Sets the next refresh of a guild, replacing the previous one.
+
+        :param guild_id: The ID of the guild.
+        :param when: When the guild should be refreshed, None to not refresh it on a timer.
+        :return: None
+        """
+        if when is None:
+            self._deadlines.pop(guild_id, None)
+            return
+        deadline = when.timestamp() + self._grace
+        if self._deadlines.get(guild_id) == deadline:
+            return
+        self._deadlines[guild_id] = deadline
+        heapq.heappush(self._heap, (deadline, guild_id))
+        if self._heap[0] == (deadline, guild_id):
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _prune(self) -> None:
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: float) -> List[int]:
+        due = []
+        self._prune()
+        while self._heap and self._heap[0][0] <= now:
+            _, guild_id = heapq.heappop(self._heap)
+            del self._deadlines[guild_id]
+            due.append(guild_id)
+            self._prune()
+        return due
+
+    async def _refresh_bounded(self, guild_id: int) -> None:
+        async with self._semaphore:
+            await self._refresh(guild_id)
+
+    async def _run(self) -> None:
+        while True:
+            self._prune()
+            self._wakeup.clear()
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            due = self._pop_due(time.time())
+            if due:
+                self.logger.info(f"<Boundary refresh for {len(due)} guild(s).>")
+                await asyncio.gather(*(self._refresh_bounded(guild_id) for guild_id in due), return_exceptions=True)
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Coroutine, Optional, Set
+
+
+class TaskSupervisor:
+    """
+    Keeps strong references to fire-and-forget tasks so they are not garbage-collected mid-flight, logs their
+    failures, and lets them be drained on shutdown.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._tasks: Set[asyncio.Task] = set()
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """
+        Runs a coroutine in the background.
+
+        :param coro: The coroutine to run.
+        :param name: The name of the task, used in logs.
+        :return: asyncio.Task
+        """
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (e := task.exception()):
+            self.logger.error(f"Background task {task.get_name()} failed.", exc_info=e)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Waits for all background tasks to finish, then cancels whatever is still running after `timeout` seconds.
+
+        :param timeout: Seconds to wait.
+        :return: None
+        """
+        if not self._tasks:
+            return
+        self.logger.info(f"<Draining {len(self._tasks)} background task(s)...>")
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.logger.warning(f"<Cancelled {len(pending)} background task(s) still running after {timeout}s.>")
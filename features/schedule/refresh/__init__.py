@@ -0,0 +1,3 @@
+from features.schedule.refresh.RefreshCoordinator import RefreshCoordinator
+from features.schedule.refresh.RefreshScheduler import RefreshScheduler
+from features.schedule.refresh.TaskSupervisor import TaskSupervisor
@@ -2,4 +2,8 @@ from features.schedule.util.command_wrappers import validate_arguments
 from features.schedule.util.datetime_parsers import parse_date, parse_time, parse_type
 from features.schedule.util.discord_py_ac import type_autocomplete
 from features.schedule.util.discord_py_checks import author_is_admin, author_is_editor, guild_registered, guild_enabled
-from features.schedule.util.schedule_render import render_schedule
+from features.schedule.util.schedule_render import render_schedule, render_history, next_render_change
+from features.schedule.util.schedule_context import ScheduleContext, schedule_context
+from features.schedule.util.event_import import parse_import
+from features.schedule.util.history_cursor import history_cursor_id, parse_history_cursor_id
+from features.schedule.util.youtube_sync import group_by_video, synced_events
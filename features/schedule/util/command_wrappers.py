@@ -1,14 +1,16 @@
+import logging
 from functools import wraps
 
 import discord
 from discord.ui import View, button
 
-from api.youtube import YouTube, YouTubeURL
+from api.youtube import YouTube, YouTubeAPIError
 from exceptions import InvalidArgument
 from features.schedule.constants import YT, CANCELLED
-from features.schedule.database import ScheduleDB
+from features.schedule.database import get_schedule_db
 from features.schedule.models import DatetimeGranularity, Event
 from features.schedule.util.datetime_parsers import parse_date, parse_time, parse_type
+from features.schedule.util.schedule_context import schedule_context
 from tools.constants import YES
 
 
@@ -26,13 +28,12 @@ def validate_arguments(func):
             if isinstance(arg, Schedule):
                 schedule_cog = arg
 
-        db = ScheduleDB()
         event = None
 
         # Validate event_id exists
         if kwargs.get("event_id", ""):
             event_id = kwargs["event_id"]
-            event = await db.get_event(interaction.guild.id, event_id)
+            event = await schedule_context(interaction).event(event_id)
             if not event:
                 raise InvalidArgument(F"No event with ID \"{event_id}\" was found.")
 
@@ -95,7 +96,7 @@ def validate_arguments(func):
             if not (url.startswith("http://") or url.startswith("https://")):
                 raise InvalidArgument(f"Invalid URL. URLs should begin with \"http://\" or \"https://\".")
             try:
-                yt = YouTube(YouTubeURL.unsafe(url))
+                yt = await YouTube.resolve(url)
 
                 class YouTubeConfirmation(View):
                     def __init__(self):
@@ -133,7 +134,7 @@ def validate_arguments(func):
                     kwargs["url"] = url
                     if view.use_all:
                         dt_g = DatetimeGranularity(True, True, True)
-                        db = ScheduleDB()
+                        db = get_schedule_db()
                         new_event = Event(
                             guild_id=interaction.guild.id,
                             event_id=event.event_id if event else await db.get_available_event_id(interaction.guild.id),
@@ -142,7 +143,8 @@ def validate_arguments(func):
                             datetime_granularity=dt_g,
                             type=parse_type(yt.content_type),
                             note=note,
-                            url=url
+                            url=url,
+                            youtube_start=yt.scheduled_start_time
                         )
                         if event:
                             await db.update_event(new_event)
@@ -154,7 +156,7 @@ def validate_arguments(func):
                             await interaction.edit_original_response(
                                 content=f"{YES}**Event `{event.event_id}` created**.", view=None
                             )
-                        await schedule_cog.update_schedule_messages(interaction.guild.id)
+                        schedule_cog.refresh_in_background(interaction)
                         return
                     else:
                         await interaction.edit_original_response(content="** **", view=None)
@@ -162,6 +164,9 @@ def validate_arguments(func):
                     await interaction.edit_original_response(content=f"{CANCELLED}**Timed out.**", view=None)
             except ValueError:
                 pass
+            except YouTubeAPIError as e:
+                # The URL is kept as a plain link when YouTube can't be reached
+                logging.getLogger("Onigiri").warning(f"YouTube lookup of {url} failed: {e.message}")
         return await func(*args, **kwargs)
 
     return wrapper
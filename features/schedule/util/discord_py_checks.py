@@ -1,13 +1,13 @@
 import discord
 from discord import app_commands
 
-from features.schedule.database import ScheduleDB
 from features.schedule.exceptions import GuildNotRegistered, GuildNotEnabled
+from features.schedule.util.schedule_context import schedule_context
 
 
 def guild_registered():
     async def predicate(interaction: discord.Interaction) -> bool:
-        guild = await ScheduleDB().get_guild_exists(interaction.guild.id)
+        guild = await schedule_context(interaction).guild()
         if guild:
             return True
         else:
@@ -18,7 +18,7 @@ def guild_registered():
 
 def guild_enabled():
     async def predicate(interaction: discord.Interaction) -> bool:
-        guild = await ScheduleDB().get_guild(interaction.guild.id)
+        guild = await schedule_context(interaction).guild()
         if guild.enabled:
             return True
         raise GuildNotEnabled
@@ -28,8 +28,7 @@ def guild_enabled():
 
 def author_is_editor():
     async def predicate(interaction: discord.Interaction) -> bool:
-        db = ScheduleDB()
-        guild = await db.get_guild(interaction.guild.id)
+        guild = await schedule_context(interaction).guild()
         for role_id in guild.editor_role_id_array:
             for role in interaction.user.roles:
                 if role.id == role_id:
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from typing import List
+
+from exceptions import InvalidArgument
+from features.schedule.constants import IMPORT_MAX_EVENTS
+from features.schedule.models import Event
+from features.schedule.util.command_wrappers import sanitize_formatting
+from features.schedule.util.datetime_parsers import parse_date, parse_time, parse_type
+
+__all__ = ["IMPORT_COLUMNS", "parse_import"]
+
+# Columns of a CSV import, in the order they are read when there is no header row
+IMPORT_COLUMNS = ["title", "date", "time", "type", "note", "url"]
+# Number of row errors listed when an import is rejected
+MAX_REPORTED_ERRORS = 10
+# Types an import may give, parse_type() would map anything else to "other" without a word
+EVENT_TYPES = ["stream", "video", "event", "release", "other"]
+
+
+def parse_import(content: str, guild_id: int) -> List[Event]:
+    """
+    Parses and validates the events of an import. Content starting with "[" is read as a JSON array of objects,
+    anything else as CSV with the columns in IMPORT_COLUMNS, with or without a header row. Every row is validated
+    before anything is returned, so an import is either accepted whole or rejected with every problem listed.
+
+    :param content: The text of the import.
+    :param guild_id: The ID of the guild to import into.
+    :return: List[Event] without event IDs.
+    """
+    rows = read_json_rows(content) if content.lstrip().startswith("[") else read_csv_rows(content)
+    if not rows:
+        raise InvalidArgument("No events found.")
+    if len(rows) > IMPORT_MAX_EVENTS:
+        raise InvalidArgument(f"Too many events. Max {IMPORT_MAX_EVENTS} per import (Currently {len(rows)}).")
+    events, errors = [], []
+    for i, row in enumerate(rows, start=1):
+        try:
+            events.append(parse_row(row, guild_id))
+        except ValueError as e:
+            errors.append(f"Event {i}: {e}")
+    if errors:
+        hidden = len(errors) - MAX_REPORTED_ERRORS
+        raise InvalidArgument("\n".join(
+            errors[:MAX_REPORTED_ERRORS] + ([f"... and {hidden} more."] if hidden > 0 else [])
+        ))
+    return events
+
+
+def read_json_rows(content: str) -> List[dict]:
+    try:
+        rows = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise InvalidArgument(f"Bad JSON input. {e}")
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise InvalidArgument("Bad JSON input. Expected a list of events.")
+    return [{str(k).lower(): "" if v is None else str(v) for k, v in row.items()} for row in rows]
+
+
+def read_csv_rows(content: str) -> List[dict]:
+    lines = [line for line in csv.reader(io.StringIO(content.strip())) if any(cell.strip() for cell in line)]
+    columns = IMPORT_COLUMNS
+    if lines and all(cell.strip().lower() in IMPORT_COLUMNS for cell in lines[0]):
+        columns = [cell.strip().lower() for cell in lines.pop(0)]
+    return [dict(zip(columns, line)) for line in lines]
+
+
+def parse_row(row: dict, guild_id: int) -> Event:
+    """
+    Validates one event of an import the same way validate_arguments validates /schedule add.
+
+    :param row: Column values keyed by lowercase column name.
+    :param guild_id: The ID of the guild to import into.
+    :return: Event without an event ID.
+    """
+    title, date, time, event_type, note, url = (row.get(column, "").strip() for column in IMPORT_COLUMNS)
+    if not title:
+        raise ValueError("Missing title.")
+    if len(title) > 30:
+        raise ValueError(f"Title too long. Max 30 characters (Currently {len(title)}).")
+    if len(note) > 30:
+        raise ValueError(f"Note too long. Max 30 characters (Currently {len(note)}).")
+    event_type = event_type.lower() or "stream"
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown type \"{event_type}\". Types are {', '.join(EVENT_TYPES)}.")
+    if url and not (url.startswith("http://") or url.startswith("https://")):
+        raise ValueError(f"Invalid URL. URLs should begin with \"http://\" or \"https://\".")
+    try:
+        datetime, granularity = parse_date(date)
+    except ValueError:
+        raise ValueError(f"Bad date input. \"{date}\" was not able to be parsed as a date.")
+    if time:
+        if not granularity.day:
+            raise ValueError("Event does not have an associated date. Set a date before setting a time.")
+        try:
+            datetime = parse_time(time, datetime)
+        except ValueError:
+            raise ValueError(f"Bad time input. \"{time}\" was not able to be parsed as a time.")
+    return Event(
+        guild_id=guild_id,
+        event_id="",
+        title=sanitize_formatting(title),
+        datetime=datetime,
+        datetime_granularity=granularity,
+        type=parse_type(event_type),
+        note=sanitize_formatting(note),
+        url=url
+    )
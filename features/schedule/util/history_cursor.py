@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from features.schedule.models import Event
+
+__all__ = ["HISTORY_CUSTOM_ID", "history_cursor_id", "parse_history_cursor_id"]
+
+# Prefix of the custom IDs of the /schedule history page buttons
+HISTORY_CUSTOM_ID = "schedule-history"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def history_cursor_id(event: Event, newer: bool) -> str:
+    """
+    Builds the custom ID of a history page button. The ID holds the whole cursor of the page it leads to, so
+    clicks can be answered without keeping any state for the message.
+
+    :param event: The first event of the current page for the newer button, the last one for the older button.
+    :param newer: Whether the button leads to newer events.
+    :return: str
+    """
+    # MongoDB stores datetimes to the millisecond, so the cursor round trips exactly
+    milliseconds = (event.datetime - _EPOCH) // timedelta(milliseconds=1)
+    return f"{HISTORY_CUSTOM_ID}:{'newer' if newer else 'older'}:{milliseconds}:{event.event_id}"
+
+
+def parse_history_cursor_id(custom_id: str) -> Optional[Tuple[bool, Tuple[datetime, str]]]:
+    """
+    Reads a custom ID built by history_cursor_id().
+
+    :param custom_id: The custom ID of the clicked component.
+    :return: Whether to get newer events and the cursor, or None if the custom ID isn't a history button's.
+    """
+    parts = custom_id.split(":")
+    if len(parts) != 4 or parts[0] != HISTORY_CUSTOM_ID or parts[1] not in ("newer", "older") \
+            or not parts[2].lstrip("-").isdigit():
+        return None
+    return parts[1] == "newer", (_EPOCH + timedelta(milliseconds=int(parts[2])), parts[3])
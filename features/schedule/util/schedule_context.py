@@ -0,0 +1,73 @@
+from typing import Dict, Optional
+
+import discord
+
+from features.schedule.database import AbstractScheduleDB, get_schedule_db
+from features.schedule.models import Event, GuildScheduleConfig
+
+__all__ = ["ScheduleContext", "schedule_context"]
+
+_MISSING = object()
+
+
+class ScheduleContext:
+    """
+    The schedule data a single interaction works on. The guild config and each event are loaded at most once, so
+    the app command checks, validate_arguments and the command itself can all look at them without another round
+    trip.
+
+    The guild config is not refreshed after the command writes to the database, read it before writing. Events
+    changed through update_event() are replaced by the updated event the write returns.
+    """
+
+    def __init__(self, guild_id: int, db: AbstractScheduleDB):
+        self.guild_id = guild_id
+        self.db = db
+        self._guild = _MISSING
+        self._events: Dict[str, Optional[Event]] = {}
+
+    async def guild(self) -> Optional[GuildScheduleConfig]:
+        """
+        Gets the guild's configs.
+
+        :return: Optional[GuildScheduleConfig], None if the guild is not registered.
+        """
+        if self._guild is _MISSING:
+            self._guild = await self.db.get_guild(self.guild_id)
+        return self._guild
+
+    async def event(self, event_id: str) -> Optional[Event]:
+        """
+        Gets an event of the guild.
+
+        :param event_id: The ID of the event.
+        :return: Optional[Event], None if the guild has no such event.
+        """
+        if event_id not in self._events:
+            self._events[event_id] = await self.db.get_event(self.guild_id, event_id)
+        return self._events[event_id]
+
+
+    async def update_event(self, event_id: str, **changes) -> Optional[Event]:
+        """
+        Changes fields of an event of the guild in one round trip, and keeps the event as it is after the update.
+
+        :param event_id: The ID of the event.
+        :param changes: New values keyed by Event field name.
+        :return: Optional[Event], the updated event, None if the guild has no such event.
+        """
+        self._events[event_id] = await self.db.update_event_fields(self.guild_id, event_id, True, **changes)
+        return self._events[event_id]
+
+
+def schedule_context(interaction: discord.Interaction) -> ScheduleContext:
+    """
+    Gets the ScheduleContext of an interaction, creating it on first use.
+
+    :param interaction: The interaction.
+    :return: ScheduleContext
+    """
+    context = interaction.extras.get("schedule_context")
+    if context is None:
+        context = interaction.extras["schedule_context"] = ScheduleContext(interaction.guild.id, get_schedule_db())
+    return context
@@ -1,21 +1,31 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Tuple, Optional
 
-from features.schedule.constants import JST, NONE, DD, DR, TR, EMOJIPEDIA, STASH, ED, YT_LOGO
-from features.schedule.models import GuildScheduleConfig, Event
+from features.schedule.constants import JST, NONE, DD, DR, TR, EMOJIPEDIA, STASH, ED, YT_LOGO, PAST_EVENTS_DISPLAYED
+from features.schedule.models import GuildScheduleConfig, Event, ScheduleWindow
 
-__all__ = ["render_schedule"]
+__all__ = ["render_schedule", "render_history", "next_render_change"]
 
 
-def render_schedule(guild: GuildScheduleConfig, events: List[Event]) -> List[str]:
+def render_schedule(
+        guild: GuildScheduleConfig, window: ScheduleWindow, refreshed_resolution: Optional[int] = 0
+) -> List[str]:
+    """
+    Renders the schedule of a guild.
+
+    :param guild: The guild's configs.
+    :param window: The events to show, from AbstractScheduleDB.get_schedule_window().
+    :param refreshed_resolution: See render_headline().
+    :return: List[str]
+    """
     content = []
-    content += render_headline(guild)
+    content += render_headline(guild, refreshed_resolution)
     content += [""]
-    if not events:
+    if not window.events:
         content += ["**No events**. Use **`/schedule add`** to add some!"]
     else:
-        past_events, next_event, future_events = classify_events(events)
-        content += render_past(past_events)
+        past_events, next_event, future_events = classify_events(window.events)
+        content += render_past(past_events, window.past_total)
         content += [""]
         if not next_event:
             content += ["**No future events**."]
@@ -26,7 +36,15 @@ def render_schedule(guild: GuildScheduleConfig, events: List[Event]) -> List[str
     return content
 
 
-def render_headline(guild: GuildScheduleConfig) -> List[str]:
+def render_headline(guild: GuildScheduleConfig, refreshed_resolution: Optional[int] = 0) -> List[str]:
+    """
+    Renders the headline of the schedule.
+
+    :param guild: The guild's configs.
+    :param refreshed_resolution: Seconds the "Last refreshed" timestamp is rounded down to. 0 renders the exact time,
+        None leaves the line out. Anything coarser keeps renders identical between refreshes in the same window.
+    :return: List[str]
+    """
     content = []
     if guild.talent:
         talent_possessive = guild.talent + ("'" if guild.talent.endswith("s") else "'s")
@@ -37,22 +55,29 @@ def render_headline(guild: GuildScheduleConfig) -> List[str]:
     if guild.description:
         content.append("")
         content.append(f"> {guild.description}")
-    content.append("")
-    content.append(f"> Last refreshed <t:{int(datetime.now().timestamp())}:R>.")
+    footer = []
+    if refreshed_resolution is not None:
+        refreshed = int(datetime.now().timestamp())
+        if refreshed_resolution:
+            refreshed -= refreshed % refreshed_resolution
+        footer.append(f"> Last refreshed <t:{refreshed}:R>.")
     if not guild.enabled:
-        content.append("> ⛔  **Currently disabled.**")
+        footer.append("> ⛔  **Currently disabled.**")
+    if footer:
+        content.append("")
+        content += footer
     return content
 
 
-def render_past(past_events: List[Event]) -> List[str]:
+def render_past(past_events: List[Event], total_past_events: int = 0) -> List[str]:
     if not past_events:
         return ["**No past events**."]
-    display_count = 3
-    # total_past_events = len(past_events)
+    display_count = PAST_EVENTS_DISPLAYED
     past_events = past_events[-display_count:]  # Get last x events from list
     content = [
         f"## 🗂️  Past {len(past_events)} Event{'s' if len(past_events) != 1 else ''}  "
-        # + (f"(See all {total_past_events} events with **`/history`**)" if total_past_events > display_count else "")
+        + (f"(See all {total_past_events} events with **`/schedule history`**)"
+           if total_past_events > display_count else "")
     ]
     for i, event in enumerate(past_events):
         is_last = i == len(past_events) - 1
@@ -75,6 +100,29 @@ def render_past(past_events: List[Event]) -> List[str]:
     return content
 
 
+def render_history(events: List[Event]) -> List[str]:
+    """
+    Renders one page of a guild's event history.
+
+    :param events: The page's events, newest first, from AbstractScheduleDB.get_event_history().
+    :return: List[str]
+    """
+    if not events:
+        return ["**No past events**."]
+    # One line per event keeps a full page well under Discord's message length limit
+    content = ["## 🗂️  Event History", ""]
+    for event in events:
+        stash = "~~" if event.stashed else ""
+        event_time_string, _ = format_event_time(event)
+        title_no_backslash = event.title.replace("\\", "")
+        title = event.title if not event.url else f'**[{title_no_backslash}](<{event.url}>)**'
+        content.append(
+            f"`{event.event_id}`  {EMOJIPEDIA[event.type]['past'] if not stash else STASH}"
+            f"  {stash}**{event_time_string}**  {title}{stash}" + (f"  *({event.note})*" if event.note else "")
+        )
+    return content
+
+
 def render_next_up(next_event: Event) -> List[str]:
     content = []
     newline_prefix = f"{DD}{' ' * 14}"
@@ -191,3 +239,21 @@ def has_generic_date(event: Event) -> bool:
         return event.datetime.hour == 23 and event.datetime.minute == 59 and event.datetime.second == 59
     else:
         return True
+
+
+def next_render_change(events: List[Event], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Gets the next moment the rendered schedule changes without any data changing. Relative timestamps are rendered by
+    the Discord client, so this only happens when an event moves from the future to the past, or when the date labels
+    of events without a time roll over at JST midnight.
+
+    :param events: All events of the guild.
+    :param now: The current time, defaults to now.
+    :return: Optional[datetime]
+    """
+    now = now or datetime.now(JST)
+    boundaries = [event.datetime for event in events if event.datetime and event.datetime > now]
+    if any(event.datetime and has_generic_date(event) for event in events):
+        midnight = now.astimezone(JST).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        boundaries.append(JST.normalize(midnight))
+    return min(boundaries, default=None)
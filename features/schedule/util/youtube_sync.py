@@ -0,0 +1,57 @@
+from dataclasses import replace
+from typing import Dict, List
+
+from api.youtube import YouTube, YouTubeURL
+from features.schedule.models import Event
+from features.schedule.util.datetime_parsers import parse_type
+
+__all__ = ["group_by_video", "synced_events"]
+
+# The types a YouTube video maps to, events set to any other type keep it
+YOUTUBE_TYPES = {parse_type("stream"), parse_type("video")}
+
+
+def group_by_video(events: List[Event]) -> Dict[str, List[Event]]:
+    """
+    Groups YouTube-linked events by the ID of their video, so each video is looked up once however many guilds
+    link to it. Only events still at the scheduled start they took from their video are kept, an editor who set
+    the time by hand since then chose it over the video's.
+
+    :param events: The events, from AbstractScheduleDB.get_youtube_events().
+    :return: The events linking to each video, by video ID.
+    """
+    by_video: Dict[str, List[Event]] = {}
+    for event in events:
+        if not event.youtube_start or event.datetime != event.youtube_start:
+            continue
+        try:
+            video_id = YouTubeURL.safe(event.url).get_id()
+        except ValueError:
+            continue
+        by_video.setdefault(video_id, []).append(event)
+    return by_video
+
+
+def synced_events(by_video: Dict[str, List[Event]], videos: Dict[str, dict]) -> List[Event]:
+    """
+    Gets the events whose datetime or type no longer matches their video, updated to match it. Only the scheduled
+    start of streams and premieres is followed, videos without one are skipped rather than moved to when they were
+    published.
+
+    :param by_video: The events linking to each video, from group_by_video().
+    :param videos: The videos.list items, by video ID. Videos that are missing, such as deleted ones, are skipped.
+    :return: List[Event]
+    """
+    changed = []
+    for video_id, events in by_video.items():
+        if not (video := videos.get(video_id)):
+            continue
+        youtube = YouTube(YouTubeURL.safe(f"https://youtu.be/{video_id}"), video)
+        if not (start_time := youtube.scheduled_start_time):
+            continue
+        content_type = parse_type(youtube.content_type)
+        for event in events:
+            event_type = content_type if event.type in YOUTUBE_TYPES else event.type
+            if event.datetime != start_time or event.type != event_type:
+                changed.append(replace(event, datetime=start_time, youtube_start=start_time, type=event_type))
+    return changed
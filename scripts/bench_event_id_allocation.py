@@ -0,0 +1,87 @@
+"""
+Compares the cost of allocating event IDs for guilds that already have 10, 1,000 and 9,000 events.
+
+"guess" is the previous allocator: draw a random 4-digit ID and look it up until a free one turns up. "pool" is
+ScheduleDB.allocate_event_ids, which pops IDs off a per-guild pool in one round trip. The first pool allocation
+of a guild also builds the pool, it is reported separately.
+
+Usage:
+    python scripts/bench_event_id_allocation.py --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+
+from pymongo import MongoClient, monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.database import ScheduleDB  # noqa: E402
+from features.schedule.database.event_ids import EVENT_ID_SPACE  # noqa: E402
+
+
+class RoundTrips(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def guess_event_id(db: ScheduleDB, guild_id: int) -> str:
+    while True:
+        new_id = ''.join(random.choices(string.digits, k=4))
+        if not db.events.find_one({"$and": [{"guild_id": guild_id}, {"event_id": new_id}]}):
+            return new_id
+
+
+def seed(db: ScheduleDB, guild_id: int, count: int) -> None:
+    ids = random.sample(EVENT_ID_SPACE, count)
+    db.events.insert_many([{"guild_id": guild_id, "event_id": event_id, "title": ""} for event_id in ids])
+
+
+def measure(round_trips: RoundTrips, runs: int, allocate) -> str:
+    round_trips.count = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        allocate()
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    return f"{elapsed:7.2f} ms, {round_trips.count / runs:6.1f} round trips"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="Onigiri-EventIdBench")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    round_trips = RoundTrips()
+    client = MongoClient(args.uri, event_listeners=[round_trips])
+    client.drop_database(args.db)
+    db = ScheduleDB(client, args.db)
+    try:
+        asyncio.run(db.ensure_indexes())
+        for guild_id, existing in enumerate([10, 1000, 9000], start=1):
+            seed(db, guild_id, existing)
+            print(f"{existing} existing events:")
+            print(f"    guess:      {measure(round_trips, args.runs, lambda: guess_event_id(db, guild_id))}")
+            print(f"    pool first: {measure(round_trips, 1, lambda: asyncio.run(db.allocate_event_ids(guild_id, 1)))}")
+            print(f"    pool:       "
+                  f"{measure(round_trips, args.runs, lambda: asyncio.run(db.allocate_event_ids(guild_id, 1)))}")
+    finally:
+        client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures how long the event loop is stalled while concurrent /schedule commands hit the database.
+
+A monitor coroutine asks to wake up every --tick milliseconds and records how late it actually woke up. With the
+blocking pymongo backend every query holds the loop for a full round trip, with the Motor backend the lateness
+should stay close to zero no matter how many commands run at once.
+
+Usage:
+    python scripts/bench_event_loop_stall.py --guild 547571343986524180 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.constants import PAST_EVENTS_DISPLAYED  # noqa: E402
+from features.schedule.database import AbstractScheduleDB, MotorScheduleDB, ScheduleDB  # noqa: E402
+
+
+async def simulate_edit_command(db: AbstractScheduleDB, guild_id: int, event_id: str) -> None:
+    # The reads issued by a typical `/schedule edit`: the interaction's ScheduleContext and the refresh.
+    await db.get_guild(guild_id)
+    await db.get_event(guild_id, event_id)
+    await db.get_guild(guild_id)
+    await db.get_schedule_window(guild_id, PAST_EVENTS_DISPLAYED)
+
+
+async def monitor_loop(stop: asyncio.Event, tick: float, lateness: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + tick
+        await asyncio.sleep(tick)
+        lateness.append(max(0.0, loop.time() - expected))
+
+
+async def run(db: AbstractScheduleDB, guild_id: int, event_id: str, concurrency: int, tick: float) -> dict:
+    lateness = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop(stop, tick, lateness))
+    await asyncio.sleep(tick * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(simulate_edit_command(db, guild_id, event_id) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    lateness_ms = sorted(x * 1000 for x in lateness) or [0.0]
+    return {
+        "wall_ms": elapsed * 1000,
+        "stall_total_ms": sum(lateness_ms),
+        "stall_max_ms": lateness_ms[-1],
+        "stall_p99_ms": lateness_ms[min(len(lateness_ms) - 1, int(len(lateness_ms) * 0.99))],
+        "stall_median_ms": statistics.median(lateness_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guild", type=int, required=True, help="A registered guild to read from.")
+    parser.add_argument("--event", default="0000", help="An event ID to look up (does not need to exist).")
+    parser.add_argument("--concurrency", type=int, default=20, help="Number of simultaneous commands.")
+    parser.add_argument("--tick", type=float, default=5, help="Monitor tick in milliseconds.")
+    parser.add_argument("--backend", choices=["pymongo", "motor", "both"], default="both")
+    args = parser.parse_args()
+
+    backends = {"pymongo": ScheduleDB, "motor": MotorScheduleDB}
+    names = list(backends) if args.backend == "both" else [args.backend]
+    for name in names:
+        result = asyncio.run(run(backends[name](), args.guild, args.event, args.concurrency, args.tick / 1000))
+        print(f"{name:>8}: " + ", ".join(f"{k}={v:.1f}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
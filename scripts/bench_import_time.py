@@ -0,0 +1,97 @@
+"""
+Measures how long importing the bot's cogs takes, the way Onigiri.setup_hook loads them, using `python -X importtime`.
+
+Each run imports onigiri and then every cog in a fresh interpreter. The report gives the median cumulative import
+time of each cog over all runs, and the modules that took the longest on their own. With --ref, the same
+measurement is also taken on another commit, checked out in a temporary worktree, to track an improvement.
+
+Usage:
+    python scripts/bench_import_time.py
+    python scripts/bench_import_time.py --runs 10 --ref HEAD~1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The cogs Onigiri.setup_hook loads, see onigiri.cogs
+COGS = ["features.schedule.cog", "features.general.cog"]
+
+
+def import_times(root: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Imports onigiri and the cogs in a fresh interpreter.
+
+    :param root: The directory of the checkout to import from.
+    :return: The self and cumulative import time of every module, in microseconds.
+    """
+    code = "; ".join(f"import {module}" for module in ["onigiri"] + COGS)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=root, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing the cogs failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(own), int(cumulative)
+    return times
+
+
+def measure(root: str, runs: int) -> Tuple[Dict[str, float], List[Tuple[str, float]]]:
+    cumulative: Dict[str, List[int]] = defaultdict(list)
+    own: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(runs):
+        for module, (self_us, cumulative_us) in import_times(root).items():
+            own[module].append(self_us)
+            cumulative[module].append(cumulative_us)
+    cogs = {module: statistics.median(cumulative.get(module, [0])) / 1000 for module in ["onigiri"] + COGS}
+    slowest = sorted(((module, statistics.median(us) / 1000) for module, us in own.items()), key=lambda m: -m[1])
+    return cogs, slowest[:10]
+
+
+def report(label: str, cogs: Dict[str, float], slowest: List[Tuple[str, float]]) -> None:
+    print(f"{label}:")
+    for module, ms in cogs.items():
+        print(f"    {module:<40} {ms:8.1f} ms")
+    print(f"    {'total':<40} {sum(cogs.values()):8.1f} ms")
+    print("  slowest modules (self time):")
+    for module, ms in slowest:
+        print(f"    {module:<40} {ms:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="Another commit to measure for comparison")
+    args = parser.parse_args()
+
+    current = measure(ROOT, args.runs)
+    report("working tree", *current)
+    if args.ref:
+        with tempfile.TemporaryDirectory() as worktree:
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.ref], cwd=ROOT, check=True,
+                           capture_output=True)
+            try:
+                # .env is untracked, but the modules may read it at import
+                if os.path.exists(os.path.join(ROOT, ".env")):
+                    with open(os.path.join(ROOT, ".env"), "rb") as src, \
+                            open(os.path.join(worktree, ".env"), "wb") as dst:
+                        dst.write(src.read())
+                previous = measure(worktree, args.runs)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+        report(args.ref, *previous)
+        before, after = sum(previous[0].values()), sum(current[0].values())
+        print(f"\n{args.ref} -> working tree: {before:.1f} ms -> {after:.1f} ms ({after - before:+.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
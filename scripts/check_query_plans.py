@@ -0,0 +1,78 @@
+"""
+Runs explain() on every query shape ScheduleDB issues and fails if any of them scans a whole collection.
+
+The check builds a scratch database on the given MongoDB server, creates the same indexes ScheduleDB ensures at
+startup, seeds a few documents so the planner has something to choose from, and drops the database afterwards.
+
+Usage:
+    python scripts/check_query_plans.py --uri mongodb://localhost:27017
+"""
+import argparse
+import os
+import sys
+
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.database.indexes import COLLECTION_INDEXES, QUERY_SHAPES  # noqa: E402
+
+
+def stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from stages(child)
+
+
+def seed(db) -> None:
+    db["Guilds"].insert_many([{"guild_id": i, "enabled": i % 2 == 0} for i in range(20)])
+    db["Events"].insert_many([
+        {"guild_id": i % 20, "event_id": f"{i:04}", "title": f"Event {i}", "datetime": None,
+         "datetime_granularity": {}, "note": ""}
+        for i in range(200)
+    ])
+    db["EventsArchive"].insert_many([
+        {"guild_id": i % 20, "event_id": f"{i:04}", "title": f"Archived event {i}", "datetime": None,
+         "datetime_granularity": {}, "note": ""}
+        for i in range(200, 400)
+    ])
+    db["EventIds"].insert_many([{"guild_id": i, "free": ["0001", "0002"]} for i in range(20)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="Onigiri-QueryPlanCheck")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    db = client[args.db]
+    failures = 0
+    try:
+        for collection, indexes in COLLECTION_INDEXES.items():
+            db[collection].create_indexes(indexes)
+        seed(db)
+        for shape in QUERY_SHAPES:
+            explain = db[shape.collection].find(shape.filter, sort=shape.sort).explain()
+            plan = explain["queryPlanner"]["winningPlan"]
+            used = [stage for stage in stages(plan) if stage]
+            collscan = "COLLSCAN" in used
+            if collscan and not shape.allow_collscan:
+                failures += 1
+                status = "FAIL"
+            else:
+                status = "ok  " if not collscan else "skip"
+            print(f"[{status}] {shape.collection}.{shape.name}: {' <- '.join(used)}")
+    finally:
+        client.drop_database(args.db)
+    if failures:
+        print(f"{failures} query shape(s) scan a whole collection.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Checks that schedules rendered from get_schedule_window() are identical to schedules rendered from every event of
+the guild, and reports how much less data the window query transfers.
+
+Runs read-only against an existing database.
+
+Usage:
+    python scripts/check_schedule_window.py --uri mongodb://localhost:27017 --guild 547571343986524180
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+import bson
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.constants import JST, PAST_EVENTS_DISPLAYED  # noqa: E402
+from features.schedule.database import ScheduleDB  # noqa: E402
+from features.schedule.database.indexes import EVENT_SORT  # noqa: E402
+from features.schedule.database.schedule_window import schedule_window_pipeline  # noqa: E402
+from features.schedule.models import ScheduleWindow  # noqa: E402
+from features.schedule.util import render_schedule  # noqa: E402
+
+
+def transferred(db: ScheduleDB, guild_id: int) -> tuple:
+    start = time.perf_counter()
+    full = sum(len(bson.encode(k)) for k in db.events.find({"guild_id": guild_id}, sort=EVENT_SORT))
+    full_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    pipeline = schedule_window_pipeline(guild_id, PAST_EVENTS_DISPLAYED, datetime.datetime.now(JST), db.archive.name)
+    window = len(bson.encode(next(db.events.aggregate(pipeline))))
+    window_ms = (time.perf_counter() - start) * 1000
+    return full, full_ms, window, window_ms
+
+
+async def check(db: ScheduleDB, guild_id: int) -> bool:
+    guild = await db.get_guild(guild_id)
+    if not guild:
+        print(f"{guild_id}: not registered")
+        return True
+    events = await db.get_guild_events(guild_id)
+    window = await db.get_schedule_window(guild_id, PAST_EVENTS_DISPLAYED)
+    now = datetime.datetime.now(JST)
+    # The "See all N events" hint counts archived events too
+    past_total = sum(1 for event in events if event.datetime and event.datetime <= now) \
+        + db.archive.count_documents({"guild_id": guild_id})
+    # classify_events sorts whatever it is given, so every event can be passed as one unsorted window
+    expected = render_schedule(guild, ScheduleWindow(upcoming=events, past_total=past_total), None)
+    actual = render_schedule(guild, window, None)
+    full, full_ms, window_size, window_ms = transferred(db, guild_id)
+    status = "ok  " if expected == actual else "FAIL"
+    print(
+        f"[{status}] {guild_id}: {len(events)} events, {len(window.events)} in window | "
+        f"full {full} bytes in {full_ms:.1f} ms, window {window_size} bytes in {window_ms:.1f} ms"
+    )
+    return expected == actual
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="Onigiri-Fillings")
+    parser.add_argument("--guild", type=int, action="append", help="Defaults to every registered guild.")
+    args = parser.parse_args()
+
+    db = ScheduleDB(MongoClient(args.uri), args.db)
+    guild_ids = args.guild or [guild.guild_id for guild in await db.get_all_guilds()]
+    results = [await check(db, guild_id) for guild_id in guild_ids]
+    if not all(results):
+        print(f"{results.count(False)} schedule(s) render differently from their window.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
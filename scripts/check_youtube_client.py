@@ -0,0 +1,128 @@
+"""
+Runs YouTubeClient, YouTube.fetch, YouTube.resolve and YouTubeURL.unsafe against a local stub of the YouTube Data API
+and fails if retries, timeouts, error reporting, connection reuse or the video cache misbehave. Nothing is sent to
+YouTube.
+
+Usage:
+    python scripts/check_youtube_client.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.youtube import YouTube, YouTubeAPIError, YouTubeClient, YouTubeURL, VideoCache  # noqa: E402
+
+VIDEO = {
+    "id": "5a8NyGLlorI",
+    "snippet": {"title": "Stub stream", "channelTitle": "Stub channel", "publishedAt": "2023-07-01T12:00:00Z",
+                "liveBroadcastContent": "upcoming"},
+    "liveStreamingDetails": {"scheduledStartTime": "2023-07-02T12:00:00Z"},
+    "status": {"uploadStatus": "uploaded"},
+    "contentDetails": {"duration": "P0D"},
+}
+
+
+class StubAPI:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.delay = 0.0
+        self.status = 200
+        self.peers = set()
+
+    async def videos(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=503, text="backend error")
+        if self.status != 200:
+            return web.Response(status=self.status, text="forbidden")
+        ids = request.query["id"].split(",")
+        return web.json_response({"items": [VIDEO] if VIDEO["id"] in ids else []})
+
+
+async def check(name: str, condition: bool, failures: list) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {name}")
+    if not condition:
+        failures.append(name)
+
+
+async def main() -> int:
+    stub = StubAPI()
+    app = web.Application()
+    app.router.add_get("/youtube/v3/videos", stub.videos)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = YouTubeClient("key", f"http://127.0.0.1:{port}/youtube/v3", timeout=0.5, retries=2, backoff=0.05)
+    failures = []
+    try:
+        url = await YouTubeURL.unsafe("https://www.youtube.com/watch?v=5a8NyGLlorI", client)
+        video = await YouTube.fetch(url, client, VideoCache())
+        await check("fetch", video.title == "Stub stream" and video.content_type == "stream", failures)
+
+        stub.requests = 0
+        cache = VideoCache(upcoming_ttl=0.2)
+        video = await YouTube.resolve("https://www.youtube.com/live/5a8NyGLlorI?feature=share", client, cache)
+        await check("resolve in one request", stub.requests == 1 and video.title == "Stub stream"
+                    and video.url.get_short_url() == "https://youtu.be/5a8NyGLlorI", failures)
+        await YouTube.resolve("https://youtu.be/5a8NyGLlorI", client, cache)
+        await check("cached videos cost no request", stub.requests == 1 and cache.stats.hits == 1, failures)
+        await asyncio.sleep(0.3)
+        await YouTube.resolve("https://youtu.be/5a8NyGLlorI", client, cache)
+        await check("upcoming streams expire early", stub.requests == 2, failures)
+
+        try:
+            await YouTubeURL.unsafe("https://youtu.be/missingvide", client)
+            await check("missing video raises ValueError", False, failures)
+        except ValueError:
+            await check("missing video raises ValueError", True, failures)
+
+        stub.requests, stub.failures = 0, 2
+        sent = client.requests
+        await client.videos_list([VIDEO["id"]], ["snippet"])
+        await check("retries server errors", stub.requests == 3, failures)
+        await check("retries are counted as requests", client.requests - sent == 3, failures)
+
+        stub.requests, stub.status = 0, 403
+        try:
+            await client.videos_list([VIDEO["id"]], ["snippet"])
+            await check("client errors are not retried", False, failures)
+        except YouTubeAPIError as e:
+            await check("client errors are not retried", stub.requests == 1 and e.status == 403, failures)
+        stub.status = 200
+
+        stub.requests, stub.delay = 0, 1.0
+        sent = client.requests
+        start = time.perf_counter()
+        try:
+            await client.videos_list([VIDEO["id"]], ["snippet"])
+            await check("timeouts raise YouTubeAPIError", False, failures)
+        except YouTubeAPIError:
+            await check("timeouts raise YouTubeAPIError", stub.requests == 3 and time.perf_counter() - start < 3,
+                        failures)
+            await check("failed requests are counted", client.requests - sent == 3, failures)
+        stub.delay = 0
+
+        stub.peers.clear()
+        await asyncio.gather(*[client.videos_list([VIDEO["id"]], ["snippet"]) for _ in range(5)])
+        await asyncio.gather(*[client.videos_list([VIDEO["id"]], ["snippet"]) for _ in range(5)])
+        await check(f"connections reused ({len(stub.peers)} for 10 requests)", len(stub.peers) <= 5, failures)
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
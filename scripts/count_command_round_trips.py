@@ -0,0 +1,119 @@
+"""
+Counts the schedule database calls a command makes, from its app command checks to its response, and fails if a
+command makes more than expected. The refresh the command requests afterwards is not counted.
+
+Commands run against the given MongoDB server with a throwaway guild and event in a scratch database, which is
+dropped afterwards. Only the database is real, the interaction is a stand-in that records responses.
+
+Usage:
+    python scripts/count_command_round_trips.py --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+from types import SimpleNamespace
+
+import discord
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.cog import Schedule  # noqa: E402
+from features.schedule.database import CachedScheduleDB, ScheduleDB, provider  # noqa: E402
+from features.schedule.models import DatetimeGranularity, Event, GuildScheduleConfig  # noqa: E402
+
+GUILD_ID = 1
+EVENT_ID = "1234"
+
+
+class CountingDB:
+    """Forwards every call to a backend and counts the coroutine calls, one per round trip."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def counted(*args, **kwargs):
+            self.calls[name] += 1
+            return await attr(*args, **kwargs)
+        return counted
+
+
+class FakeInteraction(discord.Interaction):
+    guild = None
+    user = None
+    extras = None
+    response = None
+
+    def __init__(self):
+        async def send_message(*_, **__):
+            pass
+        self.guild = SimpleNamespace(id=GUILD_ID, name="Round trips")
+        self.user = SimpleNamespace(roles=[], guild_permissions=discord.Permissions(manage_guild=True))
+        self.extras = {}
+        self.response = SimpleNamespace(send_message=send_message)
+
+
+async def run_command(command: discord.app_commands.Command, cog: Schedule, **kwargs) -> None:
+    interaction = FakeInteraction()
+    for check in command.checks:
+        await discord.utils.maybe_coroutine(check, interaction)
+    await command.callback(cog, interaction, **kwargs)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="Onigiri-RoundTripCount")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    counting = CountingDB(ScheduleDB(client, args.db))
+    # Every command, check and wrapper picks the database up from the provider
+    provider._instance = CachedScheduleDB(counting)
+    cog = Schedule.__new__(Schedule)
+    cog.db = provider._instance
+    cog.refresh_in_background = lambda *_, **__: None
+
+    await counting.backend.create_guild(GuildScheduleConfig(GUILD_ID, 0, [], []))
+    await counting.backend.create_event(Event(
+        GUILD_ID, EVENT_ID, "Round trips", discord.utils.utcnow(), DatetimeGranularity(True, True, True)
+    ))
+    # (command, arguments, maximum expected calls). After the first command, the event is the one its update
+    # returned, so only the guild config and the write itself are left.
+    commands = [
+        (Schedule.set_event_title, {"event_id": EVENT_ID, "title": "Renamed"}, 3),
+        (Schedule.set_event_time, {"event_id": EVENT_ID, "time": "20:00"}, 2),
+        (Schedule.set_event_date, {"event_id": EVENT_ID, "date": "2030/01/01"}, 2),
+        (Schedule.stash_event, {"event_id": EVENT_ID}, 2),
+        (Schedule.edit_event, {"event_id": EVENT_ID, "note": "Edited"}, 2),
+    ]
+    failures = 0
+    try:
+        for command, kwargs, expected in commands:
+            counting.calls.clear()
+            # Start from a cold guild cache, as a command on an idle guild would
+            cog.db.guild_cache.clear()
+            await run_command(command, cog, **kwargs)
+            total = sum(counting.calls.values())
+            status = "ok  " if total <= expected else "FAIL"
+            failures += total > expected
+            calls = ", ".join(f"{name} x{count}" for name, count in counting.calls.items())
+            print(f"[{status}] /schedule {command.name}: {total} round trips ({calls})")
+    finally:
+        client.drop_database(args.db)
+    if failures:
+        print(f"{failures} command(s) made more round trips than expected.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Writes a snapshot of schedule events, archived ones included, as NDJSON or CSV.
+
+Events are streamed guild by guild with ScheduleDB.iter_events and written as they arrive, so memory use stays flat
+however many events the database holds. Datetimes are written in ISO 8601, in JST.
+
+Usage:
+    python scripts/export_events.py --format ndjson --output events.ndjson
+    python scripts/export_events.py --uri mongodb://localhost:27017 --guild 1234 --format csv
+    python scripts/export_events.py --filter '{"stashed": true}'
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.schedule.constants import EXPORT_BATCH_SIZE  # noqa: E402
+from features.schedule.database import ScheduleDB  # noqa: E402
+from features.schedule.models import Event  # noqa: E402
+
+COLUMNS = ["guild_id", "event_id", "title", "datetime", "year", "month", "day", "type", "stashed", "url", "note"]
+
+
+def export_row(event: Event) -> dict:
+    granularity = event.datetime_granularity
+    return {
+        "guild_id": event.guild_id,
+        "event_id": event.event_id,
+        "title": event.title,
+        "datetime": event.datetime.isoformat() if event.datetime else None,
+        "year": granularity.year,
+        "month": granularity.month,
+        "day": granularity.day,
+        "type": event.type,
+        "stashed": event.stashed,
+        "url": event.url,
+        "note": event.note,
+    }
+
+
+async def export(db: ScheduleDB, args: argparse.Namespace, out) -> int:
+    event_filter = json.loads(args.filter) if args.filter else None
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(out, fieldnames=COLUMNS)
+        writer.writeheader()
+    count = 0
+    async for event in db.iter_events(args.guild, event_filter, args.batch_size):
+        if writer:
+            writer.writerow(export_row(event))
+        else:
+            out.write(json.dumps(export_row(event), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="Defaults to the bot's own database connection")
+    parser.add_argument("--db", default="Onigiri-Fillings")
+    parser.add_argument("--guild", type=int, help="Only export this guild's events")
+    parser.add_argument("--filter", help="An additional MongoDB filter on the events, as JSON")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", help="Defaults to stdout")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = ScheduleDB(MongoClient(args.uri) if args.uri else None, args.db)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        count = asyncio.run(export(db, args, out))
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} events exported.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
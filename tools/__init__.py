@@ -1 +1,2 @@
+from .cache import CacheStats, LRUCache
 from .tools import log_time
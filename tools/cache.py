@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions ({self.hit_rate:.1%} hit rate)"
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A size-bounded mapping that evicts the least recently used key once it grows beyond `max_size`.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Gets a value and marks it as recently used. Counts towards the hit/miss statistics.
+
+        :param key: The key to look up.
+        :param default: Returned when the key is not cached.
+        :return: Optional[V]
+        """
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return self._data[key]
+        self.stats.misses += 1
+        return default
+
+    def peek(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Gets a value without touching its recency or the statistics.
+
+        :param key: The key to look up.
+        :param default: Returned when the key is not cached.
+        :return: Optional[V]
+        """
+        return self._data.get(key, default)
+
+    def put(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)